@@ -1,148 +1,465 @@
 import gymnasium as gym
 from gymnasium import spaces
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import UnexpectedAlertPresentException, NoAlertPresentException
-import numpy as np
-import time
+from selenium.common.exceptions import UnexpectedAlertPresentException, NoAlertPresentException, TimeoutException
+import threading
 
-from config.constants import broadcast_log
-from agent.llm_planner import BedrockLLM
+from config.constants import HTTP_FAST_PATH, LLM_STREAMING, broadcast_log
+from config.metrics import spans, timed
+from agent.llm_planner import BedrockLLM, StreamingPlan
+from agent.page_settle import PageSettler
+from agent.driver_pool import get_driver_pool
+from agent.crawl_profile import get_profile
+from agent.http_fetcher import cookie_header, get_http_fetcher
+from agent.observation import dom_to_token_string, make_observation_encoder
+from agent.fingerprint import StateIndex, page_fingerprint, DIGITS_RE
+from agent.story_index import StoryIndex
+from agent.story_prompts import story_prompt, batch_story_prompt, parse_batch_response
+
+# Collects everything get_state/_get_valid_actions/_get_observation need in one WebDriver round trip.
+# Interactive elements are stamped with a stable data-usersim-id so actions can target them directly,
+# and a MutationObserver lets repeat calls answer {unchanged: true} when the DOM hasn't changed.
+DOM_SNAPSHOT_JS = """
+    const allowUnchanged = arguments[0];
+    const idx = window.__usersimIndex || (window.__usersimIndex = {next: 1, dirty: true, url: null, observer: null});
+    if (!idx.observer && document.documentElement) {
+        idx.observer = new MutationObserver(() => { idx.dirty = true; });
+        idx.observer.observe(document.documentElement, {subtree: true, childList: true, attributes: true, characterData: true});
+    }
+    if (allowUnchanged && !idx.dirty && idx.url === window.location.href) {
+        return {unchanged: true};
+    }
+    // WebDriver's .text is empty for elements that aren't rendered; innerText isn't, so check first
+    const rendered = el => el.checkVisibility
+        ? el.checkVisibility({checkOpacity: true, checkVisibilityCSS: true, opacityProperty: true, visibilityProperty: true})
+        : el.getClientRects().length > 0 && getComputedStyle(el).visibility !== "hidden";
+    const text = el => rendered(el) ? (el.innerText || "").trim() : "";
+    const stamp = el => el.dataset.usersimId || (el.dataset.usersimId = String(idx.next++));
+    const body = document.body;
+    const buttons = Array.from(document.getElementsByTagName("button"));
+    const inputs = Array.from(document.getElementsByTagName("input"));
+    const links = Array.from(document.getElementsByTagName("a"));
+    const snapshot = {
+        url: window.location.href,
+        buttons: buttons.map(text),
+        button_ids: buttons.map(stamp),
+        inputs: inputs.map(i => i.getAttribute("name") || ""),
+        input_ids: inputs.map(stamp),
+        links: links.map(a => [text(a), a.href || ""]),
+        link_ids: links.map(stamp),
+        skeleton: body ? Array.from(body.getElementsByTagName("*"), e => e.tagName).slice(0, 3000) : [],
+        html: body ? body.innerHTML : ""
+    };
+    if (!idx.loadReported && document.readyState === "complete" && window.performance) {
+        // Bytes and load time of this document, reported once for the crawl profile stats
+        const nav = performance.getEntriesByType("navigation")[0];
+        const resources = performance.getEntriesByType("resource");
+        snapshot.page_load = {
+            bytes: resources.reduce((sum, r) => sum + (r.transferSize || 0), nav ? nav.transferSize || 0 : 0),
+            load_ms: nav ? nav.loadEventEnd - nav.startTime : 0
+        };
+        idx.loadReported = true;
+    }
+    if (idx.observer) {
+        idx.observer.takeRecords();  // Our own id stamping doesn't count as a change
+    }
+    idx.dirty = false;
+    idx.url = snapshot.url;
+    return snapshot;
+"""
+
+# Runs an indexed action in one call; returns false if the indexed elements are gone or none of them
+# can be interacted with, leaving the action to WebDriver, which enforces interactability itself
+EXECUTE_ACTION_JS = """
+    const kind = arguments[0], ids = arguments[1], value = arguments[2];
+    const rendered = el => el.checkVisibility
+        ? el.checkVisibility({checkOpacity: true, checkVisibilityCSS: true, opacityProperty: true, visibilityProperty: true})
+        : el.getClientRects().length > 0 && getComputedStyle(el).visibility !== "hidden";
+    const interactable = el => {
+        if (el.disabled || (kind === "type" && el.readOnly) || !rendered(el)) {
+            return false;
+        }
+        el.scrollIntoView({block: "center", inline: "center"});
+        const rect = el.getBoundingClientRect();
+        const hit = document.elementFromPoint(rect.left + rect.width / 2, rect.top + rect.height / 2);
+        return !!hit && (hit === el || el.contains(hit));  // not covered by an overlay
+    };
+    const elements = ids
+        .map(id => document.querySelector('[data-usersim-id="' + id + '"]'))
+        .filter(el => el && interactable(el));
+    if (!elements.length) {
+        return false;
+    }
+    if (kind === "type") {
+        for (const el of elements) {
+            el.focus();
+            // The prototype's setter, so frameworks that track the value (React) see the change
+            const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+            Object.getOwnPropertyDescriptor(proto, "value").set.call(el, value);
+            el.dispatchEvent(new Event("input", {bubbles: true}));
+            el.dispatchEvent(new Event("change", {bubbles: true}));
+        }
+    } else {
+        elements[0].click();
+    }
+    return true;
+"""
 
 
 class BrowserGymEnv(gym.Env):
-    def __init__(self, use_llm=True, llm=None, start_url="https://example.com", max_obs_tokens=5000):
+    def __init__(self, use_llm=True, llm=None, start_url="https://example.com", max_obs_tokens=5000, settler=None,
+                 obs_mode="chars", state_index=None, driver_pool=None, profile=None, stream_llm=LLM_STREAMING,
+                 http_fast_path=HTTP_FAST_PATH, fetcher=None):
         super().__init__()
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-
-        self.driver = webdriver.Chrome(options=chrome_options)
+        # Browsers are checked out of a warm pool; close() hands this one back for the next env
+        self.profile = driver_pool.profile if driver_pool else get_profile(profile)
+        self.driver_pool = driver_pool or get_driver_pool(self.profile.name)
+        self.settler = settler or PageSettler()
+        self._driver = None
+        # Fast path: server-rendered pages are fetched and parsed over HTTP, and Chrome is only
+        # checked out once a page needs JavaScript or an action a plain GET can't reproduce
+        self.fetcher = (fetcher or get_http_fetcher()) if http_fast_path else None
+        self.static_page = None
         self.use_llm = use_llm
         self.llm = llm if use_llm else None
+        # Stream plans so the agent can start on the first action while the rest is generated
+        self.stream_llm = stream_llm and hasattr(self.llm, "query_stream")
         self.start_url = start_url
         self.max_obs_tokens = max_obs_tokens
         self.action_lookup = []
+        self.actions_url = None  # Page action_lookup was planned for
         self.action_space = spaces.Discrete(10)
-        self.observation_space = spaces.Box(low=0, high=255, shape=(self.max_obs_tokens,), dtype=np.uint8)
+        self.obs_encoder = make_observation_encoder(obs_mode, max_obs_tokens)
+        self.observation_space = self.obs_encoder.space
+
+        # Structurally equivalent pages (same template) share one action plan
+        self.state_index = state_index or StateIndex()
+        self.template_plans = {}
 
-        self.seen_user_stories = set()
+        self.seen_user_stories = StoryIndex()     # Near-duplicate stories count as seen
+        self.scored_transitions = set()           # (template, action) pairs already sent for scoring
+        self._story_lock = threading.Lock()
+        self.on_new_story = None  # Optional callback(story), e.g. for checkpointing
         self.visited_urls = set()
         self.visited_dom_elements = set()
         self.last_state = None
         self.last_action = None
+        self._snapshot = None
+        self._last_snapshot = None
+        self.last_settle_time = 0.0
+        self.total_settle_time = 0.0
+
+    @property
+    def driver(self):
+        # Checked out on first use, so building an env (e.g. just to read its spaces) launches nothing
+        if self._driver is None:
+            self._driver = self.driver_pool.checkout()
+            self.settler.attach(self._driver)
+        return self._driver
+
+    @property
+    def current_url(self):
+        """URL of the page being explored, whether it was fetched over HTTP or loaded in the browser."""
+        if self.static_page is not None:
+            return self.static_page.url
+        return self.driver.current_url
+
+    def close(self):
+        if self._driver is not None:
+            self.driver_pool.release(self._driver)
+            self._driver = None
+
+    @timed("env.settle")
+    def _wait_for_settle(self):
+        if self.static_page is not None:
+            self.last_settle_time = 0.0  # Nothing renders or runs on a fetched page
+            return
+        self.last_settle_time = self.settler.wait(self.driver)
+        self.total_settle_time += self.last_settle_time
+
+    def _get_snapshot(self):
+        # Cached per step; invalidated when an action runs or the page navigates
+        if self._snapshot is None and self.static_page is not None:
+            self._snapshot = self.static_page.snapshot
+        if self._snapshot is None:
+            try:
+                with spans.span("env.snapshot"):
+                    snapshot = self.driver.execute_script(DOM_SNAPSHOT_JS, self._last_snapshot is not None)
+            except Exception as e:
+                broadcast_log(f"⚠️ Error while taking DOM snapshot: {e}")
+                try:
+                    url = self.driver.current_url  # Credit the page we're actually on, not the start URL
+                except Exception:
+                    raise e from None
+                return {"url": url, "buttons": [], "inputs": [], "links": [], "html": ""}
+            if snapshot.get("unchanged"):
+                snapshot = self._last_snapshot  # DOM untouched since last time: keep the existing index
+            elif "page_load" in snapshot:
+                self.profile.stats.record(snapshot.pop("page_load"))
+            self._snapshot = self._last_snapshot = snapshot
+        return self._snapshot
+
+    def _invalidate_snapshot(self):
+        self._snapshot = None
+
+    def _element_index(self):
+        """Maps action keys ("click_button:Save", "type:email", ...) to the element ids they target."""
+        snapshot = self._get_snapshot()
+        if "index" not in snapshot:
+            index = {}
+            for text, element_id in zip(snapshot["buttons"], snapshot.get("button_ids", [])):
+                if text:
+                    index.setdefault(f"click_button:{text}", []).append(element_id)
+            for name, element_id in zip(snapshot["inputs"], snapshot.get("input_ids", [])):
+                if name:
+                    index.setdefault(f"type:{name}", []).append(element_id)
+            for (text, _), element_id in zip(snapshot["links"], snapshot.get("link_ids", [])):
+                if text:
+                    index.setdefault(f"click_link:{text}", []).append(element_id)
+            snapshot["index"] = index
+        return snapshot["index"]
+
+    def _current_template(self, snapshot=None):
+        snapshot = snapshot or self._get_snapshot()
+        if "template" not in snapshot:
+            snapshot["fingerprint"] = page_fingerprint(snapshot)
+            snapshot["template"] = self.state_index.resolve(snapshot["fingerprint"], snapshot["url"])
+        return snapshot["template"]
 
     def _get_observation(self):
+        dom = self._get_snapshot()["html"] or ""
+        return self.obs_encoder.encode(dom)
+
+    def _load(self, url):
+        if self.fetcher is not None and self._load_static(url):
+            return
+        self.static_page = None
         try:
-            dom = self.driver.execute_script("return document.body.innerHTML")
-        except:
-            dom = ""
-        tokens = self._dom_to_token_list(dom)
-        vector = [min(ord(c), 255) for c in tokens[:self.max_obs_tokens]]
-        vector += [0] * (self.max_obs_tokens - len(vector))
-        return np.array(vector, dtype=np.uint8)
+            self.driver.get(url)
+        except TimeoutException:
+            # Page-load cap hit: stop loading and explore whatever has rendered so far
+            self.profile.stats.record_timeout()
+            broadcast_log(f"⏱️ Page load timed out under the '{self.profile.name}' profile: {url}")
+            try:
+                self.driver.execute_script("window.stop();")
+            except Exception:
+                pass
+
+    def _load_static(self, url) -> bool:
+        """Fetches url over HTTP; False (after logging why) if the page has to go to the browser."""
+        page = None
+        reason = self.fetcher.browser_reason(url)
+        if reason is None:
+            try:
+                page = self.fetcher.fetch(url, cookies=self._browser_cookies(url))
+                reason = page.requires_browser
+            except Exception as e:
+                reason = f"fetch failed: {e}"
+        if reason is not None:
+            self.fetcher.record("escalated")
+            broadcast_log(f"🌐 Loading {url} in the browser: {reason}")
+            return False
+        self.fetcher.record("static")
+        self.static_page = page
+        self.profile.stats.record(page.load_stats)
+        return True
+
+    def _browser_cookies(self, url):
+        """Cookie header for url from the browser session, so pages fetched after e.g. a login
+        in Chrome are seen logged in. WebDriver only exposes the current document's cookies."""
+        if self._driver is None:
+            return None
+        try:
+            return cookie_header(self._driver.get_cookies(), url)
+        except Exception:
+            return None
 
+    def _escalate(self, reason):
+        """Reopens the current fetched page in the browser so the next action runs there."""
+        url = self.static_page.url
+        broadcast_log(f"🌐 Opening {url} in the browser: {reason}")
+        self.fetcher.record("escalated")
+        self.static_page = None
+        self._invalidate_snapshot()
+        try:
+            self.driver.get(url)
+        except TimeoutException:
+            self.profile.stats.record_timeout()
+        self._wait_for_settle()
+        self._handle_alerts()
+
+    @timed("env.reset")
     def reset(self, *, seed=None, options=None):
         super().reset(seed=seed)
-        self.driver.get(self.start_url)
-        time.sleep(1)
+        self._load(self.start_url)
+        self._wait_for_settle()
         self._handle_alerts()
-        self.action_lookup = self._get_valid_actions()
+        self._invalidate_snapshot()
+        # Forget the previous episode before planning, or a repeat reset (e.g. vector autoreset)
+        # starts with its visited actions filtered out and without a fresh LLM plan
         self.seen_user_stories.clear()
+        self.scored_transitions.clear()
         self.visited_urls.clear()
         self.visited_dom_elements.clear()
         self.last_state = None
         self.last_action = None
-        self.visited_urls.add(self.driver.current_url)
+        self.action_lookup = []
+        self.action_lookup = self._get_valid_actions()
+        self.actions_url = self._get_snapshot()["url"]
+        self.visited_urls.add(self._get_snapshot()["url"])
         obs = self._get_observation()
-        return obs, {}
+        return obs, {"settle_time": self.last_settle_time}
+
+    def navigate(self, url):
+        """Loads url directly and re-plans its actions, keeping episode history intact."""
+        self._load(url)
+        self._wait_for_settle()
+        self._handle_alerts()
+        self._invalidate_snapshot()
+        self.refresh_actions()
+        self.visited_urls.add(self._get_snapshot()["url"])
+
+    def refresh_actions(self):
+        """Re-plans actions for the current page from scratch (LLM planning included)."""
+        self.action_lookup = []
+        self.action_lookup = self._get_valid_actions()
+        self.actions_url = self._get_snapshot()["url"]
 
     def step(self, action_idx):
-        if action_idx >= len(self.action_lookup):
+        try:
+            # Indexing (unlike len()) lets a streamed plan's first actions run before it completes
+            action = self.action_lookup[action_idx]
+        except IndexError:
             return self._get_observation(), -1.0, True, False, {}
-
-        action = self.action_lookup[action_idx]
         self._execute_action(action)
         reward = self._generate_user_story_reward()
         terminated = reward == 1.0
         truncated = False
         self.action_lookup = self._get_valid_actions()
+        self.actions_url = self._get_snapshot()["url"]
         obs = self._get_observation()
-        return obs, reward, terminated, truncated, {}
+        return obs, reward, terminated, truncated, {"settle_time": self.last_settle_time}
 
     def _dom_to_token_list(self, html):
-        html = html.replace("<", " <").replace(">", "> ")
-        tokens = html.split()
-        return " ".join(tokens)
+        return dom_to_token_string(html)
 
+    def _page_actions(self, snapshot=None):
+        """Every action the current page offers, visited or not."""
+        snapshot = snapshot or self._get_snapshot()
+        actions = [f"click_button:{text}" for text in snapshot["buttons"] if text]
+        actions += [f"type:{name}:test123" for name in snapshot["inputs"] if name]
+        actions += [f"click_link:{text}" for text, href in snapshot["links"] if text and href]
+        return actions
+
+    @staticmethod
+    def _element_key(action):
+        # The element an action targets: LLM plans come back lower-cased and type: values are free text
+        kind, _, rest = action.partition(":")
+        if kind == "type":
+            rest = rest.split(":", 1)[0]
+        return f"{kind}:{rest.lower()}"
+
+    def remap_actions(self, actions) -> list:
+        """Maps planned actions (possibly from another page of the same template) onto this page's elements.
+
+        Button and link labels match case-insensitively, and type: actions match by input name
+        and keep their planned value. Failing that, an action takes the next unused element on
+        this page with the same label up to digits, so "click_link:item 2" planned on /item/1
+        becomes "click_link:Item 43" on /item/42. None marks actions with no counterpart here.
+        """
+        try:
+            page_actions = self._page_actions()
+        except Exception as e:
+            broadcast_log(f"⚠️ Error while scraping DOM for actions: {e}")
+            return list(actions)
+        by_element = {}
+        for action in page_actions:
+            by_element.setdefault(self._element_key(action), []).append(action)
+        used = set()
+
+        def take(planned, candidates):
+            for action in candidates:
+                if action not in used:
+                    used.add(action)
+                    if planned.startswith("type:") and planned.count(":") == 2:
+                        return f"{action.rsplit(':', 1)[0]}:{planned.split(':', 2)[2]}"
+                    return action
+            return None
+
+        remapped = [take(action, by_element.get(self._element_key(action), ())) for action in actions]
+        by_shape = {}
+        for action in page_actions:
+            if action not in used:
+                by_shape.setdefault(DIGITS_RE.sub("#", self._element_key(action)), []).append(action)
+        for i, action in enumerate(actions):
+            if remapped[i] is None:
+                remapped[i] = take(action, by_shape.get(DIGITS_RE.sub("#", self._element_key(action)), ()))
+        return remapped
+
+    def _plan_for_page(self, plan, fallback):
+        """A plan's actions as they apply to this page, or fallback if none of them do."""
+        actions = [a for a in self.remap_actions(plan) if a]
+        if not actions:
+            broadcast_log("⚠️ No planned action matches this page. Falling back.")
+            return fallback
+        return actions[:10]
+
+    @timed("env.get_valid_actions")
     def _get_valid_actions(self):
         actions = []
         try:
-            for b in self.driver.find_elements(By.TAG_NAME, "button"):
-                text = b.text.strip()
-                if text:
-                    key = f"click_button:{text}"
-                    if key not in self.visited_dom_elements:
-                        actions.append(key)
-
-            for i in self.driver.find_elements(By.TAG_NAME, "input"):
-                name = i.get_attribute("name")
-                if name:
-                    key = f"type:{name}:test123"
-                    if key not in self.visited_dom_elements:
-                        actions.append(key)
-
-            for l in self.driver.find_elements(By.TAG_NAME, "a"):
-                text = l.text.strip()
-                href = l.get_attribute("href")
-                if text and href:
-                    key = f"click_link:{text}"
-                    if key not in self.visited_dom_elements:
-                        actions.append(key)
+            actions = [a for a in self._page_actions() if a not in self.visited_dom_elements]
         except Exception as e:
             broadcast_log(f"⚠️ Error while scraping DOM for actions: {e}")
 
         if self.use_llm and not self.action_lookup:
+            template = self._current_template()
+            plan = self.template_plans.get(template)
+            if plan:
+                broadcast_log(f"♻️ Reusing action plan from equivalent page {template}")
+                return self._plan_for_page(plan, actions[:10])
             try:
-                dom = self.driver.page_source
-                css = self.driver.execute_script("""
-                    return Array.from(document.styleSheets)
-                        .map(sheet => {
-                            try {
-                                return sheet.ownerNode && sheet.ownerNode.outerHTML;
-                            } catch (e) {
-                                return '';
-                            }
-                        }).join('\\n');
-                """)
-
-                js = self.driver.execute_script("""
-                    return Array.from(document.scripts)
-                        .map(script => {
-                            try {
-                                return script.outerHTML;
-                            } catch (e) {
-                                return '';
-                            }
-                        }).join('\\n');
-                """)
-
-                visited_str = "\n".join(self.visited_urls)
+                if self.static_page is not None:
+                    dom, css, js = self.static_page.dom_context()
+                else:
+                    dom = self.driver.page_source
+                    css = self.driver.execute_script("""
+                        return Array.from(document.styleSheets)
+                            .map(sheet => {
+                                try {
+                                    return sheet.ownerNode && sheet.ownerNode.outerHTML;
+                                } catch (e) {
+                                    return '';
+                                }
+                            }).join('\\n');
+                    """)
+
+                    js = self.driver.execute_script("""
+                        return Array.from(document.scripts)
+                            .map(script => {
+                                try {
+                                    return script.outerHTML;
+                                } catch (e) {
+                                    return '';
+                                }
+                            }).join('\\n');
+                    """)
+
+                visited_str = "\n".join(sorted(self.visited_urls))  # Stable order, so the LLM cache key is too
                 prompt = (
                     f"Visited URLs so far:\n{visited_str}\n\n"
                     f"Please return a precise, ordered list of next user actions to explore or test this page."
                 )
+                if self.stream_llm:
+                    return self._stream_plan(template, prompt, dom, css, js, fallback=actions[:10])
                 llm_response = self.llm.query(prompt, dom=dom, css=css, js=js)
                 broadcast_log(f"🧠 Raw LLM Response:\n{llm_response}")
 
                 parsed_actions = BedrockLLM.resolve_llm_suggestion(llm_response, valid_actions=actions)
                 if parsed_actions:
                     broadcast_log(f"✅ Parsed LLM Actions:\n" + "\n".join(parsed_actions))
-                    return parsed_actions[:10]
+                    self.template_plans[template] = parsed_actions
+                    return self._plan_for_page(parsed_actions, actions[:10])
                 else:
                     broadcast_log("⚠️ No valid LLM actions parsed. Falling back.")
             except Exception as e:
@@ -150,7 +467,22 @@ class BrowserGymEnv(gym.Env):
 
         return actions[:10]
 
+    def _stream_plan(self, template, prompt, dom, css, js, fallback):
+        def on_complete(parsed_actions, error):
+            if error is not None:
+                broadcast_log(f"❌ LLM action stream failed: {error}")
+            if parsed_actions:
+                broadcast_log("✅ Streamed LLM Actions:\n" + "\n".join(parsed_actions))
+                self.template_plans[template] = parsed_actions
+            else:
+                broadcast_log("⚠️ No valid LLM actions streamed. Falling back.")
+
+        stream = self.llm.query_stream(prompt, dom=dom, css=css, js=js, max_actions=10)
+        return StreamingPlan(stream, fallback=fallback, on_complete=on_complete)
+
     def _handle_alerts(self):
+        if self.static_page is not None:
+            return
         try:
             alert = self.driver.switch_to.alert
             text = alert.text
@@ -159,10 +491,31 @@ class BrowserGymEnv(gym.Env):
         except NoAlertPresentException:
             pass
 
+    @timed("env.execute_action")
     def _execute_action(self, action):
         try:
             self.visited_dom_elements.add(action)
             parts = action.split(":", 2)
+            if self.static_page is not None:
+                label = parts[1] if len(parts) > 1 else ""
+                if not self.static_page.has_control(parts[0], label):
+                    # Same as the browser fallback finding nothing to click; no reason to open Chrome
+                    broadcast_log(f"⚠️ '{action}' is not on {self.static_page.url}; skipping.")
+                    return
+                href = self.static_page.link_target(label) if parts[0] == "click_link" else None
+                if href:
+                    self._invalidate_snapshot()
+                    self._load(href)  # Following a plain link is just another GET
+                    return
+                self._escalate(f"'{action}' needs a real browser")
+            index_key = f"type:{parts[1]}" if parts[0] == "type" and len(parts) == 3 else action
+            element_ids = self._element_index().get(index_key)
+            self._invalidate_snapshot()
+            if element_ids and self.driver.execute_script(
+                EXECUTE_ACTION_JS, parts[0], element_ids, parts[2] if len(parts) == 3 else ""
+            ):
+                return
+            # Not indexed (e.g. LLM-suggested) or stale: fall back to scanning with WebDriver
             if parts[0] == "click_button":
                 for b in self.driver.find_elements(By.TAG_NAME, "button"):
                     if b.text.strip() == parts[1]:
@@ -184,55 +537,104 @@ class BrowserGymEnv(gym.Env):
             broadcast_log(f"⚠️ Error while executing action '{action}': {e}")
         finally:
             self._handle_alerts()
-            time.sleep(1)
+            self._wait_for_settle()
+            self._handle_alerts()
+            self._invalidate_snapshot()
             self.last_action = action
             self.last_state = self.get_state()
-            self.visited_urls.add(self.driver.current_url)
+            self.visited_urls.add(self.last_state["url"])
 
     def _generate_user_story_reward(self):
+        return self.score_transition(self.capture_transition())
+
+    def capture_transition(self):
+        """Snapshots what the reward prompt needs so it can be scored after the browser moves on."""
         if not self.use_llm or not self.llm:
-            return -0.1
+            return None
 
         if not self.last_state or not self.last_action:
-            return -0.1
+            return None
 
-        url = self.last_state["url"]
-        dom = self.driver.execute_script("return document.body.innerHTML")
-        dom_snippet = dom[:800].strip().replace("```", "")
-
-        prompt = (
-            f"Based on the following action and DOM, classify if this path is novel or repeated. Then return:\n"
-            f"1. Classification (novel or repeated)\n"
-            f"2. A user story\n"
-            f"3. A pytest-style Selenium test\n"
-            f"4. A snippet of matching DOM\n\n"
-            f"URL: {url}\n"
-            f"Action: {self.last_action}\n"
-            f"DOM:\n{dom_snippet}\n"
-        )
+        # The same action on another page of the same template won't tell the LLM anything new
+        key = (self.last_state["template"], DIGITS_RE.sub("#", self.last_action))
+        with self._story_lock:
+            if key in self.scored_transitions:
+                return None
+            self.scored_transitions.add(key)
+
+        dom = self._get_snapshot()["html"] or ""
+        return {
+            "url": self.last_state["url"],
+            "action": self.last_action,
+            "dom_snippet": dom[:800].strip().replace("```", ""),
+        }
+
+    @timed("reward.score")
+    def score_transition(self, transition):
+        if transition is None:
+            return -0.1
 
         try:
-            response = self.llm.query(prompt).strip()
+            response = self.llm.query(story_prompt(transition)).strip()
             broadcast_log(f"📘 LLM User Story Classification + Test:\n{response}")
-
-            if response in self.seen_user_stories:
-                return -0.1
-            else:
-                self.seen_user_stories.add(response)
-                return 1.0
+            return self._story_reward(response)
         except Exception as e:
             broadcast_log(f"⚠️ Failed to generate story/test/dom: {e}")
             return -0.1
 
+    @timed("reward.score_batch")
+    def score_transitions(self, transitions) -> list:
+        """Scores several transitions with one LLM call, falling back to one call per unparsed item."""
+        pending = [i for i, t in enumerate(transitions) if t is not None]
+        if len(pending) < 2:
+            return [self.score_transition(t) for t in transitions]
+
+        batch = [transitions[i] for i in pending]
+        try:
+            response = self.llm.query(batch_story_prompt(batch), max_tokens=min(300 * len(batch), 4096))
+            answers = parse_batch_response(response, len(batch))
+        except Exception as e:
+            broadcast_log(f"⚠️ Batched story generation failed, scoring one by one: {e}")
+            answers = {}
+        if len(answers) < len(batch):
+            broadcast_log(f"⚠️ Parsed {len(answers)}/{len(batch)} batched stories; scoring the rest one by one")
+
+        rewards = [-0.1] * len(transitions)
+        for j, i in enumerate(pending):
+            if j in answers:
+                broadcast_log(f"📘 LLM User Story Classification + Test:\n{answers[j]}")
+                rewards[i] = self._story_reward(answers[j])
+            else:
+                rewards[i] = self.score_transition(transitions[i])
+        return rewards
+
+    def _story_reward(self, response) -> float:
+        # May run on a RewardPipeline worker while the agent keeps stepping
+        with self._story_lock:
+            if not self.seen_user_stories.add(response):
+                return -0.1
+        if self.on_new_story is not None:
+            self.on_new_story(response)
+        return 1.0
+
     def perform_action(self, action: str):
         return self._execute_action(action)
 
+    @timed("env.get_state")
     def get_state(self):
-        url = self.driver.current_url
-        buttons = [b.text.strip() for b in self.driver.find_elements(By.TAG_NAME, "button") if b.text.strip()]
-        inputs = [i.get_attribute("name") for i in self.driver.find_elements(By.TAG_NAME, "input") if i.get_attribute("name")]
-        links = [l.text.strip() for l in self.driver.find_elements(By.TAG_NAME, "a") if l.text.strip()]
-        return {"url": url, "buttons": buttons, "inputs": inputs, "links": links}
+        snapshot = self._get_snapshot()
+        buttons = [b for b in snapshot["buttons"] if b]
+        inputs = [i for i in snapshot["inputs"] if i]
+        links = [text for text, _ in snapshot["links"] if text]
+        template = self._current_template(snapshot)
+        return {
+            "url": snapshot["url"],
+            "buttons": buttons,
+            "inputs": inputs,
+            "links": links,
+            "fingerprint": snapshot["fingerprint"],
+            "template": template,
+        }
 
     def random_action(self) -> list[str]:
         # Basic fallback: randomly click a visible button
@@ -246,6 +648,8 @@ class BrowserGymEnv(gym.Env):
         return self._generate_user_story_reward()
 
     def get_dom_context(self) -> tuple[str, str, str]:
+        if self.static_page is not None:
+            return self.static_page.dom_context()
         try:
             dom = self.driver.page_source
         except:
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+import threading
+
+from config.constants import CHECKPOINT_DIR, CHECKPOINT_COMPACT_EVERY
+
+
+def checkpoint_path_for(start_url: str) -> str:
+    """Default checkpoint location for a crawl, so resuming the same start URL finds it."""
+    digest = hashlib.sha1(start_url.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(CHECKPOINT_DIR, f"crawl-{digest}")
+
+
+class CheckpointStore:
+    """Append-only event log plus a periodically compacted snapshot.
+
+    Every state change is appended to <path>.log as one compact JSON line, which is cheap
+    enough to do on every step. Once the log holds compact_every records, the caller's full
+    state is written to <path>.snapshot (atomically) and the log is truncated. Loading
+    returns the snapshot and the events appended since, to be replayed in order.
+    """
+
+    def __init__(self, path, compact_every=CHECKPOINT_COMPACT_EVERY):
+        self.path = path
+        self.snapshot_path = f"{path}.snapshot"
+        self.log_path = f"{path}.log"
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._log = None
+        self._records = 0
+
+    def _open_log(self):
+        if self._log is None:
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            self._log = open(self.log_path, "a", encoding="utf-8")
+
+    def append(self, *event):
+        line = json.dumps(event, separators=(",", ":"), ensure_ascii=False)
+        with self._lock:
+            self._open_log()
+            self._log.write(line + "\n")
+            self._log.flush()
+            self._records += 1
+
+    def needs_compaction(self) -> bool:
+        return self._records >= self.compact_every
+
+    def compact(self, state: dict):
+        with self._lock:
+            os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, separators=(",", ":"), ensure_ascii=False)
+            os.replace(tmp_path, self.snapshot_path)
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            open(self.log_path, "w").close()
+            self._records = 0
+
+    def load(self):
+        """Returns (snapshot or None, [events]); a torn final log line from a crash is ignored."""
+        snapshot = None
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+        events = []
+        if os.path.exists(self.log_path):
+            valid_bytes = 0
+            with open(self.log_path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        break
+                    valid_bytes += len(line)
+            if valid_bytes != os.path.getsize(self.log_path):
+                os.truncate(self.log_path, valid_bytes)  # Drop the torn tail so new appends stay readable
+        self._records = len(events)
+        return snapshot, events
+
+    def clear(self):
+        """Discards any previous checkpoint so a fresh crawl doesn't replay stale events."""
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            for path in (self.snapshot_path, self.log_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._records = 0
+
+    def close(self):
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
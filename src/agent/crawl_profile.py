@@ -0,0 +1,120 @@
+import threading
+
+from config.constants import CRAWL_PROFILE, FAST_PAGE_LOAD_TIMEOUT, FAITHFUL_PAGE_LOAD_TIMEOUT
+
+# Images, fonts and media never affect which buttons, inputs and links a page offers
+HEAVY_RESOURCE_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico", "*.bmp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.ogg", "*.mp3", "*.wav", "*.m4a", "*.mov",
+]
+
+# Analytics, ads and tag managers: third-party scripts that only add network chatter
+TRACKER_PATTERNS = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*facebook.net*", "*connect.facebook.com*", "*hotjar.com*", "*segment.io*", "*segment.com/analytics*",
+    "*mixpanel.com*", "*amplitude.com*", "*newrelic.com*", "*nr-data.net*", "*fullstory.com*",
+    "*clarity.ms*", "*optimizely.com*", "*intercom.io*", "*sentry.io*",
+]
+
+DISABLE_ANIMATIONS_JS = """
+    (() => {
+        const apply = () => {
+            const style = document.createElement("style");
+            style.textContent = "*, *::before, *::after { animation: none !important; " +
+                "transition: none !important; scroll-behavior: auto !important; caret-color: auto !important; }";
+            (document.head || document.documentElement).appendChild(style);
+        };
+        if (document.documentElement) { apply(); } else { document.addEventListener("DOMContentLoaded", apply); }
+    })();
+"""
+
+
+class CrawlProfile:
+    """How much of each page the browser actually loads.
+
+    "faithful" renders pages as a user would see them. "fast" blocks images, fonts, media and
+    known tracker scripts through Chrome DevTools, turns off CSS animations/transitions (so
+    the page settles sooner) and caps how long a single page load may take.
+    """
+
+    def __init__(self, name, blocked_urls=(), block_images=False, disable_animations=False, page_load_timeout=None):
+        self.name = name
+        self.blocked_urls = list(blocked_urls)
+        self.block_images = block_images
+        self.disable_animations = disable_animations
+        self.page_load_timeout = page_load_timeout
+        self.stats = PageLoadStats()
+
+    def configure_options(self, chrome_options):
+        if self.block_images:
+            chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+            chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        return chrome_options
+
+    def apply(self, driver):
+        """Installs the profile on a freshly launched driver; it survives pool resets."""
+        if self.blocked_urls:
+            try:
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blocked_urls})
+            except Exception:
+                pass  # Non-Chromium drivers still get the image prefs and timeout
+        if self.disable_animations:
+            try:
+                driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": DISABLE_ANIMATIONS_JS})
+            except Exception:
+                pass
+        if self.page_load_timeout:
+            driver.set_page_load_timeout(self.page_load_timeout)
+
+
+class PageLoadStats:
+    """Running totals of transferred bytes and load times for the pages loaded under a profile."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pages = 0
+        self.bytes = 0
+        self.load_time = 0.0
+        self.timeouts = 0
+
+    def record(self, page_load):
+        with self._lock:
+            self.pages += 1
+            self.bytes += int(page_load.get("bytes") or 0)
+            self.load_time += float(page_load.get("load_ms") or 0) / 1000
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            pages = max(self.pages, 1)
+            return {
+                "pages": self.pages,
+                "bytes": self.bytes,
+                "avg_bytes": self.bytes / pages,
+                "avg_load_time": self.load_time / pages,
+                "timeouts": self.timeouts,
+            }
+
+
+PROFILES = {
+    "faithful": CrawlProfile("faithful", page_load_timeout=FAITHFUL_PAGE_LOAD_TIMEOUT),
+    "fast": CrawlProfile(
+        "fast",
+        blocked_urls=HEAVY_RESOURCE_PATTERNS + TRACKER_PATTERNS,
+        block_images=True,
+        disable_animations=True,
+        page_load_timeout=FAST_PAGE_LOAD_TIMEOUT,
+    ),
+}
+
+
+def get_profile(name=None) -> CrawlProfile:
+    name = (name or CRAWL_PROFILE).lower()
+    if name not in PROFILES:
+        raise ValueError(f"Unknown crawl profile '{name}' (expected one of: {', '.join(PROFILES)})")
+    return PROFILES[name]
@@ -0,0 +1,189 @@
+import re
+from html.parser import HTMLParser
+
+from config.constants import LLM_CONTEXT_TOKEN_BUDGET
+
+CHARS_PER_TOKEN = 4
+SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg"}
+SCRIPT_RE = re.compile(r"<script\b[^>]*>(.*?)</script>", re.IGNORECASE | re.DOTALL)
+STYLE_RULE_RE = re.compile(r"([^{}]+)\{([^{}]*)\}")
+# Only keep JS that wires up interactions and CSS that hides or reveals elements
+RELEVANT_JS_RE = re.compile(r"addEventListener|onclick|onsubmit|\.submit\(|fetch\(|XMLHttpRequest|location\s*=|alert\(")
+RELEVANT_CSS_RE = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden")
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _clean(text, limit=80):
+    text = WHITESPACE_RE.sub(" ", text).strip()
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+class _InteractiveElementParser(HTMLParser):
+    """Collects forms and interactive controls (with their labels) from page source."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.forms = []         # [{"attrs": ..., "controls": [...]}]
+        self.controls = []      # controls outside any form
+        self.labels = {}        # input id -> label text
+        self._skip_depth = 0
+        self._form = None
+        self._text_target = None  # (element dict, tag) collecting inner text
+        self._label_for = None
+        self._label_text = []
+        self._in_title = False
+        self._select = None
+
+    def _add(self, element):
+        (self._form["controls"] if self._form is not None else self.controls).append(element)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+            return
+        if self._skip_depth:
+            return
+        attrs = {k: v or "" for k, v in attrs}
+
+        if tag == "title":
+            self._in_title = True
+        elif tag == "form":
+            self._form = {"attrs": attrs, "controls": []}
+            self.forms.append(self._form)
+        elif tag == "label":
+            self._label_for = attrs.get("for")
+            self._label_text = []
+        elif tag == "input":
+            if attrs.get("type", "text").lower() != "hidden":
+                self._add({"kind": "input", "attrs": attrs, "text": ""})
+        elif tag == "select":
+            self._select = {"kind": "select", "attrs": attrs, "text": "", "options": []}
+            self._add(self._select)
+        elif tag == "option" and self._select is not None:
+            self._text_target = ({"text": ""}, tag)
+        elif tag in ("button", "a", "textarea") or "onclick" in attrs or attrs.get("role") == "button":
+            element = {"kind": tag, "attrs": attrs, "text": ""}
+            self._add(element)
+            self._text_target = (element, tag)
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        if self._skip_depth:
+            return
+        if tag == "title":
+            self._in_title = False
+        elif tag == "form":
+            self._form = None
+        elif tag == "label":
+            if self._label_for:
+                self.labels[self._label_for] = _clean(" ".join(self._label_text))
+            self._label_for = None
+        elif tag == "select":
+            self._select = None
+        elif self._text_target is not None and tag == self._text_target[1]:
+            element = self._text_target[0]
+            if tag == "option" and self._select is not None:
+                self._select["options"].append(_clean(element["text"], 30))
+            self._text_target = None
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self._in_title:
+            self.title += data
+        if self._label_for is not None:
+            self._label_text.append(data)
+        if self._text_target is not None:
+            self._text_target[0]["text"] += data
+
+
+def _describe(element, labels):
+    attrs = element["attrs"]
+    kind = element["kind"]
+    text = _clean(element["text"])
+    parts = [kind]
+    if text:
+        parts.append(f'"{text}"')
+    for attr in ("name", "type", "placeholder", "aria-label", "role", "value"):
+        value = attrs.get(attr)
+        if value and not (attr == "value" and kind != "input"):
+            parts.append(f'{attr}="{_clean(value, 40)}"')
+    label = labels.get(attrs.get("id", ""))
+    if label:
+        parts.append(f'label="{label}"')
+    if kind == "a" and attrs.get("href"):
+        parts.append(f'-> {_clean(attrs["href"], 60)}')
+    if element.get("options"):
+        parts.append("options=[" + ", ".join(element["options"][:8]) + "]")
+    if "onclick" in attrs:
+        parts.append("onclick")
+    return " ".join(parts)
+
+
+def distill_dom(dom: str) -> list[str]:
+    """Turns page source into one line per interactive element, grouped by form."""
+    parser = _InteractiveElementParser()
+    try:
+        parser.feed(dom)
+        parser.close()
+    except Exception:
+        pass  # Keep whatever was parsed before malformed markup
+
+    lines = []
+    if parser.title.strip():
+        lines.append(f"title: {_clean(parser.title)}")
+    for i, form in enumerate(parser.forms, 1):
+        attrs = form["attrs"]
+        details = " ".join(f"{k}={attrs[k]}" for k in ("id", "name", "action", "method") if attrs.get(k))
+        lines.append(f"form #{i} ({details})" if details else f"form #{i}")
+        lines.extend("  " + _describe(element, parser.labels) for element in form["controls"])
+    # Links last: they are the most numerous and the least specific to this page
+    others = sorted(parser.controls, key=lambda e: e["kind"] == "a")
+    lines.extend(_describe(element, parser.labels) for element in others)
+    return lines
+
+
+def distill_js(js: str, limit=300) -> list[str]:
+    snippets = []
+    for body in SCRIPT_RE.findall(js):
+        if RELEVANT_JS_RE.search(body):
+            snippets.append(_clean(body, limit))
+    return snippets
+
+
+def distill_css(css: str) -> list[str]:
+    return [
+        _clean(f"{selector.strip()} {{{rules.strip()}}}", 120)
+        for selector, rules in STYLE_RULE_RE.findall(css)
+        if RELEVANT_CSS_RE.search(rules)
+    ]
+
+
+def distill_context(dom: str = "", css: str = "", js: str = "", token_budget: int = LLM_CONTEXT_TOKEN_BUDGET) -> str:
+    """Compact planning context: interactive elements first, then relevant JS/CSS, within budget."""
+    sections = [
+        ("Interactive elements", distill_dom(dom) if dom else []),
+        ("Relevant JS", distill_js(js) if js else []),
+        ("Relevant CSS", distill_css(css) if css else []),
+    ]
+    budget = token_budget * CHARS_PER_TOKEN
+    out = []
+    for title, lines in sections:
+        if not lines:
+            continue
+        header = f"--- {title} ---"
+        if len(header) + 1 > budget:
+            break
+        out.append(header)
+        budget -= len(header) + 1
+        for i, line in enumerate(lines):
+            if len(line) + 1 > budget:
+                out.append(f"... ({len(lines) - i} more omitted)")
+                budget = 0
+                break
+            out.append(line)
+            budget -= len(line) + 1
+    return "\n".join(out)
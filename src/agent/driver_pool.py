@@ -0,0 +1,178 @@
+import contextvars
+import threading
+import time
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from config.constants import DRIVER_POOL_SIZE, DRIVER_MAX_USES, broadcast_log
+from agent.crawl_profile import get_profile
+
+
+def build_chrome_options() -> Options:
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+    return chrome_options
+
+
+class DriverPool:
+    """Keeps headless Chrome instances warm and hands them out to environments.
+
+    Returned drivers are reset cheaply (cookies, storage, extra windows, about:blank) instead of
+    being relaunched, health-checked before reuse, and recycled after max_uses checkouts or as
+    soon as they stop responding. At most size drivers exist at once; checkout() blocks when
+    all of them are busy. Every driver in a pool is launched under the pool's crawl profile.
+    """
+
+    def __init__(self, size=DRIVER_POOL_SIZE, max_uses=DRIVER_MAX_USES, options_factory=build_chrome_options,
+                 profile=None):
+        self.profile = get_profile(profile)
+        self.size = size
+        self.max_uses = max_uses
+        self.options_factory = options_factory
+        self._idle = []
+        self._uses = {}           # id(driver) -> completed checkouts
+        self._live = 0
+        self._closed = False
+        self._available = threading.Condition()
+
+    def _launch(self):
+        driver = webdriver.Chrome(options=self.profile.configure_options(self.options_factory()))
+        try:
+            self.profile.apply(driver)
+        except Exception:
+            driver.quit()
+            raise
+        return driver
+
+    def prewarm(self, count=None):
+        """Tops the pool up to count idle drivers (all free slots by default), launching them in parallel."""
+        with self._available:
+            wanted = (count if count is not None else self.size) - len(self._idle)
+            count = min(wanted, self.size - self._live)
+            self._live += max(count, 0)
+
+        def launch():
+            try:
+                driver = self._launch()
+            except Exception as e:
+                broadcast_log(f"⚠️ Failed to prewarm browser: {e}")
+                with self._available:
+                    self._live -= 1
+                    self._available.notify()
+                return
+            with self._available:
+                self._uses[id(driver)] = 0
+                self._idle.append(driver)
+                self._available.notify()
+
+        threads = [threading.Thread(target=contextvars.copy_context().run, args=(launch,), daemon=True)
+                   for _ in range(max(count, 0))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def checkout(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._available:
+                if self._closed:
+                    raise RuntimeError("Driver pool is closed")
+                if self._idle:
+                    driver = self._idle.pop()
+                elif self._live < self.size:
+                    self._live += 1
+                    driver = None
+                else:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("No browser became available in the driver pool")
+                    self._available.wait(remaining)
+                    continue
+
+            if driver is None:
+                try:
+                    driver = self._launch()
+                except Exception:
+                    with self._available:
+                        self._live -= 1
+                        self._available.notify()
+                    raise
+                self._uses[id(driver)] = 0
+                return driver
+
+            if self._is_healthy(driver):
+                return driver
+            self._discard(driver)
+
+    def release(self, driver):
+        uses = self._uses.get(id(driver), 0) + 1
+        self._uses[id(driver)] = uses
+        if uses >= self.max_uses or self._closed or not self._reset(driver):
+            self._discard(driver)
+            return
+        with self._available:
+            self._idle.append(driver)
+            self._available.notify()
+
+    def close(self):
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._discard(driver)
+
+    @staticmethod
+    def _is_healthy(driver) -> bool:
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _reset(driver) -> bool:
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.execute_script("try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}")
+            try:
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+                driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+            except Exception:
+                driver.delete_all_cookies()  # Current origin only, but better than nothing
+            driver.get("about:blank")
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, driver):
+        self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self._available:
+            self._live -= 1
+            self._available.notify()
+
+
+_shared_pools = {}
+_shared_pool_lock = threading.Lock()
+
+
+def get_driver_pool(profile=None) -> DriverPool:
+    """Returns the process-wide pool for a crawl profile, which BrowserGymEnv uses by default."""
+    name = get_profile(profile).name
+    with _shared_pool_lock:
+        if name not in _shared_pools:
+            _shared_pools[name] = DriverPool(profile=name)
+        return _shared_pools[name]
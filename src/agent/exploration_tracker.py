@@ -0,0 +1,103 @@
+import sys
+from collections import defaultdict
+
+BUTTON = 0
+INPUT = 1
+LINK = 2
+
+ACTION_KINDS = {"click_button": BUTTON, "type": INPUT, "click_link": LINK}
+
+
+class ExplorationTracker:
+    """Known vs. interacted elements per URL with incrementally maintained completeness counts.
+
+    Elements are stored as interned (kind, label) tuples. Every update adjusts a per-URL count
+    of known-but-untouched elements, a global total and the number of URLs that still have
+    any, so "is this URL / everything done?" checks are O(1) instead of rescanning every set.
+    """
+
+    def __init__(self):
+        self._known = defaultdict(set)
+        self._interacted = defaultdict(set)
+        self._remaining = defaultdict(int)   # url -> known elements not yet interacted with
+        self._keys = {}
+        self.remaining_total = 0
+        self.incomplete_urls = 0
+
+    def _key(self, kind, label):
+        key = self._keys.get((kind, label))
+        if key is None:
+            key = self._keys[(kind, label)] = (kind, sys.intern(label))
+        return key
+
+    def _adjust(self, url, delta):
+        before = self._remaining[url]
+        after = self._remaining[url] = before + delta
+        self.remaining_total += delta
+        if before == 0 and after > 0:
+            self.incomplete_urls += 1
+        elif before > 0 and after == 0:
+            self.incomplete_urls -= 1
+
+    def add_known(self, url, kind, labels) -> list:
+        """Adds labels to url's known elements and returns the ones that were new."""
+        known = self._known[url]
+        interacted = self._interacted[url]
+        added = []
+        for label in labels:
+            key = self._key(kind, label)
+            if key not in known:
+                known.add(key)
+                added.append(label)
+                if key not in interacted:
+                    self._adjust(url, 1)
+        return added
+
+    def mark_interacted(self, url, kind, label):
+        key = self._key(kind, label)
+        interacted = self._interacted[url]
+        if key in interacted:
+            return
+        interacted.add(key)
+        known = self._known[url]
+        if key in known:
+            self._adjust(url, -1)
+        else:
+            known.add(key)
+
+    def track_action(self, url, action):
+        """Marks the element an action string (e.g. "type:name:value") targets as interacted."""
+        kind_name, _, rest = action.partition(":")
+        kind = ACTION_KINDS.get(kind_name)
+        if kind is None or not rest:
+            return
+        if kind == INPUT:
+            parts = rest.split(":")
+            if len(parts) != 2:
+                return
+            rest = parts[0]
+        self.mark_interacted(url, kind, rest)
+
+    def is_fully_explored(self, url) -> bool:
+        return self._remaining.get(url, 0) == 0
+
+    def remaining(self, url) -> int:
+        return self._remaining.get(url, 0)
+
+    def all_done(self) -> bool:
+        return self.incomplete_urls == 0
+
+    def to_dict(self) -> dict:
+        return {
+            "known": {url: [list(k) for k in keys] for url, keys in self._known.items()},
+            "interacted": {url: [list(k) for k in keys] for url, keys in self._interacted.items()},
+        }
+
+    def load(self, data):
+        """Merges a to_dict() export into this tracker, keeping the counts consistent."""
+        for url, keys in data.get("known", {}).items():
+            for kind, label in keys:
+                self.add_known(url, kind, [label])
+        for url, keys in data.get("interacted", {}).items():
+            for kind, label in keys:
+                self.mark_interacted(url, kind, label)
@@ -0,0 +1,120 @@
+import hashlib
+import re
+import threading
+from collections import Counter
+
+SIMHASH_BITS = 64
+SIMHASH_MASK = (1 << SIMHASH_BITS) - 1
+DIGITS_RE = re.compile(r"\d+")
+
+
+def _normalise_label(label):
+    # "Item 42" and "Item 43" are the same control on a templated page
+    return DIGITS_RE.sub("#", label.lower())
+
+
+def structural_features(snapshot) -> Counter:
+    """Features describing a page's interactive structure rather than its content.
+
+    Uses tag-skeleton trigrams plus button/link labels and input names. Free text, ids and
+    query strings are left out, so /item?id=1 and /item?id=2 from the same template produce
+    (nearly) the same features. Digits in labels are normalised for the same reason.
+    """
+    features = Counter()
+    skeleton = snapshot.get("skeleton") or []
+    for i in range(len(skeleton) - 2):
+        features["tags:" + ">".join(skeleton[i:i + 3])] += 1
+    for label in snapshot.get("buttons", []):
+        if label:
+            features["button:" + _normalise_label(label)] += 2
+    for name in snapshot.get("inputs", []):
+        if name:
+            features["input:" + name] += 2
+    for label, _ in snapshot.get("links", []):
+        if label:
+            features["link:" + _normalise_label(label)] += 1
+    return features
+
+
+def simhash(features: Counter) -> int:
+    weights = [0] * SIMHASH_BITS
+    for feature, count in features.items():
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += count if (h >> bit) & 1 else -count
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def control_signature(snapshot) -> int:
+    """Exact hash of the page's form controls: its input names and (normalised) button labels.
+
+    Kept out of the SimHash because a shared nav and footer outweigh a handful of controls there,
+    which would fold login, register and search pages of one layout into a single template.
+    """
+    controls = {"input:" + name for name in snapshot.get("inputs", []) if name}
+    controls.update("button:" + _normalise_label(label) for label in snapshot.get("buttons", []) if label)
+    digest = hashlib.blake2b("\n".join(sorted(controls)).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def page_fingerprint(snapshot) -> int:
+    """Control signature in the high bits, structural SimHash in the low SIMHASH_BITS."""
+    return (control_signature(snapshot) << SIMHASH_BITS) | simhash(structural_features(snapshot))
+
+
+class StateIndex:
+    """Near-duplicate index mapping page fingerprints to page templates.
+
+    Two pages share a template only if their control signatures are identical and their
+    SimHashes are near-duplicates. The 64-bit SimHash is split into bands; any two within
+    max_distance bits of each other (max_distance < bands) share at least one identical band,
+    so lookups only compare against candidates from matching (signature, band) buckets
+    instead of every known state.
+    """
+
+    def __init__(self, max_distance=3, bands=4):
+        if max_distance >= bands:
+            raise ValueError("max_distance must be smaller than the number of bands")
+        self.max_distance = max_distance
+        self.bands = bands
+        self._band_bits = SIMHASH_BITS // bands
+        self._buckets = [dict() for _ in range(bands)]  # (signature, band value) -> [(fingerprint, template)]
+        self._lock = threading.Lock()
+
+    def _band_values(self, fingerprint):
+        mask = (1 << self._band_bits) - 1
+        controls = fingerprint >> SIMHASH_BITS
+        return [(controls, (fingerprint >> (i * self._band_bits)) & mask) for i in range(self.bands)]
+
+    def lookup(self, fingerprint):
+        with self._lock:
+            return self._lookup(fingerprint)
+
+    def _lookup(self, fingerprint):
+        for bucket, value in zip(self._buckets, self._band_values(fingerprint)):
+            for candidate, template in bucket.get(value, ()):
+                if bin((candidate ^ fingerprint) & SIMHASH_MASK).count("1") <= self.max_distance:
+                    return template
+        return None
+
+    def resolve(self, fingerprint, url) -> str:
+        """Returns the template this page belongs to, registering url as a new template if none."""
+        with self._lock:
+            template = self._lookup(fingerprint)
+            if template is None:
+                template = url
+                self._add(fingerprint, template)
+            return template
+
+    def add(self, fingerprint, template):
+        with self._lock:
+            if self._lookup(fingerprint) is None:
+                self._add(fingerprint, template)
+
+    def _add(self, fingerprint, template):
+        for bucket, value in zip(self._buckets, self._band_values(fingerprint)):
+            bucket.setdefault(value, []).append((fingerprint, template))
@@ -0,0 +1,124 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+from array import array
+from collections import deque
+
+from config.constants import HISTORY_RETENTION, HISTORY_SPILL_DIR
+
+
+class TransitionRecord:
+    __slots__ = ("state_id", "action_ids", "reward")
+
+    def __init__(self, state_id, action_ids, reward):
+        self.state_id = state_id
+        self.action_ids = action_ids
+        self.reward = reward
+
+
+class TransitionHistory:
+    """Compact, bounded record of (state, actions, reward) per agent step.
+
+    Actions are interned to small integer ids (kept in an array per record) and each distinct
+    state is stored once, keyed by its template (or URL), with records pointing at it. Only
+    the last retention records stay in memory; older ones are appended to a JSONL spill file
+    as they fall out of the window. Rewards that resolve after their record was spilled are
+    appended to the same file as {"i": index, "reward": r} lines.
+    """
+
+    def __init__(self, retention=HISTORY_RETENTION, spill_dir=HISTORY_SPILL_DIR):
+        self.retention = retention
+        self.spill_dir = spill_dir
+        self.spill_path = None
+        self._actions = []          # action id -> action string
+        self._action_ids = {}
+        self._states = []           # state id -> first state dict seen for that key
+        self._state_ids = {}
+        self._records = deque()
+        self._first = 0             # global index of self._records[0]
+        self._spill = None
+        self._lock = threading.Lock()
+
+    def action_id(self, action) -> int:
+        action_id = self._action_ids.get(action)
+        if action_id is None:
+            action = sys.intern(action)
+            action_id = self._action_ids[action] = len(self._actions)
+            self._actions.append(action)
+        return action_id
+
+    def _state_id(self, state) -> int:
+        key = state.get("template") or state["url"]
+        state_id = self._state_ids.get(key)
+        if state_id is None:
+            state_id = self._state_ids[key] = len(self._states)
+            self._states.append(state)
+        return state_id
+
+    def append(self, state, actions, reward=None) -> int:
+        """Stores a step and returns its index, for set_reward() once a deferred reward resolves."""
+        with self._lock:
+            record = TransitionRecord(self._state_id(state), array("I", map(self.action_id, actions)), reward)
+            self._records.append(record)
+            index = self._first + len(self._records) - 1
+            while len(self._records) > self.retention:
+                self._write(self._first, self._records.popleft())
+                self._first += 1
+            return index
+
+    def set_reward(self, index, reward):
+        with self._lock:
+            if index >= self._first:
+                self._records[index - self._first].reward = reward
+            else:
+                self._write_line({"i": index, "reward": reward})
+
+    def _expand(self, record):
+        return self._states[record.state_id], [self._actions[i] for i in record.action_ids], record.reward
+
+    def __getitem__(self, index):
+        """(state, actions, reward) for a step still inside the retention window."""
+        with self._lock:
+            if index < 0:
+                index += self._first + len(self._records)
+            if not self._first <= index < self._first + len(self._records):
+                raise IndexError(f"step {index} is outside the in-memory window")
+            return self._expand(self._records[index - self._first])
+
+    def __iter__(self):
+        with self._lock:
+            records = list(self._records)
+        return (self._expand(record) for record in records)
+
+    def __len__(self):
+        """Total steps recorded, including spilled ones."""
+        return self._first + len(self._records)
+
+    def _write(self, index, record):
+        state = self._states[record.state_id]
+        self._write_line({
+            "i": index,
+            "url": state.get("url"),
+            "state": state.get("template") or state.get("url"),
+            "actions": [self._actions[i] for i in record.action_ids],
+            "reward": record.reward,
+        })
+
+    def _write_line(self, entry):
+        if self._spill is None:
+            if self.spill_path is None:
+                os.makedirs(self.spill_dir, exist_ok=True)
+                fd, self.spill_path = tempfile.mkstemp(prefix="history-", suffix=".jsonl", dir=self.spill_dir)
+                self._spill = os.fdopen(fd, "w", encoding="utf-8")
+            else:
+                self._spill = open(self.spill_path, "a", encoding="utf-8")
+        self._spill.write(json.dumps(entry, separators=(",", ":"), ensure_ascii=False) + "\n")
+
+    def close(self):
+        """Closes the spill file; it is reopened for appending if more steps spill later."""
+        with self._lock:
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
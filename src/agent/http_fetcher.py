@@ -0,0 +1,268 @@
+import re
+import threading
+import time
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+
+import urllib3
+
+from config.constants import (
+    BROWSER_ONLY_URL_PATTERNS,
+    HTTP_FETCH_TIMEOUT,
+    HTTP_POOL_MAXSIZE,
+    STATIC_MIN_TEXT_CHARS,
+)
+from config.metrics import spans
+
+# Some sites serve a bare-bones page to unknown clients; look like the Chrome we'd otherwise use
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+)
+
+HEAD_TAGS = {"html", "head", "title", "meta", "link", "base", "style", "script", "noscript"}
+RAW_TEXT_TAGS = {"script", "style", "noscript", "template"}  # content never rendered as text
+FRAMEWORK_ATTRS = {"ng-app", "ng-version", "data-reactroot", "x-data", "v-cloak"}
+CHARSET_RE = re.compile(r"charset=([\w-]+)", re.I)
+BODY_START_RE = re.compile(r"<body\b[^>]*>", re.I)
+MAX_SKELETON = 3000
+
+
+def cookie_header(cookies, url):
+    """Cookie header carrying the WebDriver-style cookies (name, value, domain, path, secure) that apply to url."""
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    path = parts.path or "/"
+    matching = []
+    for cookie in cookies:
+        domain = (cookie.get("domain") or host).lstrip(".").lower()
+        if host != domain and not host.endswith("." + domain):
+            continue
+        if not path.startswith(cookie.get("path") or "/"):
+            continue
+        if cookie.get("secure") and parts.scheme != "https":
+            continue
+        matching.append(f"{cookie['name']}={cookie['value']}")
+    return "; ".join(matching) or None
+
+
+class StaticPageParser(HTMLParser):
+    """Pulls the same buttons, inputs, links and tag skeleton out of raw HTML that DOM_SNAPSHOT_JS
+    reads from a rendered page, plus the signals used to decide whether the page needs JavaScript."""
+
+    def __init__(self, base_url):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.buttons = []
+        self.inputs = []
+        self.links = []         # [text, absolute href, followable without a browser]
+        self.skeleton = []
+        self.styles = []
+        self.scripts = []
+        self.text_chars = 0
+        self.js_signals = []
+        self._in_body = False
+        self._captures = []     # open <button>/<a> elements collecting their text: [tag, parts, target]
+        self._raw = None        # open <script>/<style>/<noscript>/<template>: [tag, start tag, parts]
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if self._raw is not None:
+            return
+        if tag == "base" and attrs.get("href"):
+            self.base_url = urljoin(self.base_url, attrs["href"])
+        elif tag == "meta" and (attrs.get("http-equiv") or "").lower() == "refresh":
+            self.js_signals.append("meta refresh")
+        elif tag == "link" and "stylesheet" in (attrs.get("rel") or "").lower():
+            self.styles.append(self.get_starttag_text())
+
+        if tag == "body" or (not self._in_body and tag not in HEAD_TAGS):
+            self._in_body = True  # Browsers open <body> implicitly at the first content tag
+            if tag == "body":
+                return
+        if self._in_body and len(self.skeleton) < MAX_SKELETON:
+            self.skeleton.append(tag.upper())
+        for attr in FRAMEWORK_ATTRS.intersection(attrs):
+            self.js_signals.append(f"{attr} attribute")
+
+        if tag in RAW_TEXT_TAGS:
+            self._raw = [tag, self.get_starttag_text(), []]
+        elif tag == "input":
+            self.inputs.append(attrs.get("name") or "")
+        elif tag == "button":
+            self._captures.append(["button", [], None])
+        elif tag == "a":
+            href = attrs.get("href")
+            href = urljoin(self.base_url, href.strip()) if href is not None else ""
+            # Anything a plain GET can't reproduce is left to the browser
+            followable = (
+                urlsplit(href).scheme in ("http", "https")
+                and "onclick" not in attrs
+                and (attrs.get("target") or "_self") in ("_self", "_top", "_parent")
+            )
+            self._captures.append(["a", [], (href, followable)])
+
+    def handle_endtag(self, tag):
+        if self._raw is not None:
+            if tag == self._raw[0]:
+                self._close_raw(tag)
+            return
+        for i in range(len(self._captures) - 1, -1, -1):
+            if self._captures[i][0] == tag:
+                for capture in reversed(self._captures[i:]):
+                    self._finish_capture(capture)
+                del self._captures[i:]
+                break
+
+    def handle_data(self, data):
+        if self._raw is not None:
+            self._raw[2].append(data)
+            return
+        if self._in_body:
+            self.text_chars += len(data.strip())
+        for capture in self._captures:
+            capture[1].append(data)
+
+    def _close_raw(self, tag):
+        _, start, parts = self._raw
+        self._raw = None
+        content = "".join(parts)
+        if tag == "script":
+            self.scripts.append(f"{start}{content}</script>")
+        elif tag == "style":
+            self.styles.append(f"{start}{content}</style>")
+        elif tag == "noscript" and "javascript" in content.lower():
+            self.js_signals.append("noscript asks for JavaScript")
+
+    def _finish_capture(self, capture):
+        tag, parts, link = capture
+        text = " ".join("".join(parts).split())
+        if tag == "button":
+            self.buttons.append(text)
+        else:
+            self.links.append([text, link[0], link[1]])
+
+    def close(self):
+        super().close()
+        if self._raw is not None:
+            self._close_raw(self._raw[0])
+        for capture in reversed(self._captures):
+            self._finish_capture(capture)
+        self._captures = []
+
+
+class StaticPage:
+    """A page fetched over plain HTTP, exposing the snapshot shape BrowserGymEnv builds its state from."""
+
+    def __init__(self, url, status, content_type, html, load_ms, size):
+        self.url = url
+        self.status = status
+        self.content_type = content_type
+        self.html = html
+        self.load_stats = {"bytes": size, "load_ms": load_ms}
+        self.parser = StaticPageParser(url)
+        if self.is_html:
+            self.parser.feed(html)
+        self.parser.close()
+
+        body = BODY_START_RE.search(html)
+        start = body.end() if body else 0
+        end = html.lower().rfind("</body")
+        self.snapshot = {
+            "url": url,
+            "buttons": self.parser.buttons,
+            "inputs": self.parser.inputs,
+            "links": [(text, href) for text, href, _ in self.parser.links],
+            "skeleton": self.parser.skeleton,
+            "html": html[start:end if end >= start else len(html)],
+        }
+
+    @property
+    def is_html(self):
+        return not self.content_type or "html" in self.content_type.lower()
+
+    @property
+    def requires_browser(self):
+        """Why this page can't be explored from its HTML alone, or None if it can."""
+        if not 200 <= self.status < 300:
+            return f"HTTP {self.status}"  # Incl. a redirect chain too long to follow; the browser shows what a user gets
+        if not self.is_html:
+            return f"not an HTML page ({self.content_type})"
+        if self.parser.js_signals:
+            return ", ".join(dict.fromkeys(self.parser.js_signals))
+        if self.parser.scripts and self.parser.text_chars < STATIC_MIN_TEXT_CHARS:
+            return f"{len(self.parser.scripts)} script(s) and only {self.parser.text_chars} chars of text (client-rendered?)"
+        return None
+
+    def has_control(self, kind, label) -> bool:
+        """Whether the page has the element an action of kind ("click_link", "click_button", "type") targets."""
+        if kind == "click_link":
+            return any(text == label for text, _, _ in self.parser.links)
+        if kind == "click_button":
+            return label in self.parser.buttons
+        if kind == "type":
+            return label in self.parser.inputs
+        return False
+
+    def link_target(self, text):
+        """URL that clicking the first link labelled text leads to, or None if that needs a browser."""
+        for label, href, followable in self.parser.links:
+            if label == text:
+                return href if followable else None
+        return None
+
+    def dom_context(self) -> tuple[str, str, str]:
+        return self.html, "\n".join(self.parser.styles), "\n".join(self.parser.scripts)
+
+
+class HttpFetcher:
+    """Pooled, keep-alive HTTP client for the static-page fast path, shared by every env in the process."""
+
+    def __init__(self, timeout=HTTP_FETCH_TIMEOUT, maxsize=HTTP_POOL_MAXSIZE, browser_only=BROWSER_ONLY_URL_PATTERNS):
+        self.http = urllib3.PoolManager(
+            maxsize=maxsize,
+            headers={"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8"},
+            timeout=urllib3.Timeout(total=timeout),
+            # No overall cap, so the redirect budget isn't eaten by the connect/read retries
+            retries=urllib3.Retry(total=None, connect=2, read=2, redirect=10, raise_on_redirect=False),
+        )
+        self.browser_only = [re.compile(pattern) for pattern in browser_only]
+        self.stats = {"static": 0, "escalated": 0}
+        self._lock = threading.Lock()
+
+    def browser_reason(self, url):
+        for pattern in self.browser_only:
+            if pattern.search(url):
+                return f"matches browser-only pattern {pattern.pattern}"
+        return None
+
+    def fetch(self, url, cookies=None) -> StaticPage:
+        """GETs url; cookies is a ready-made Cookie header, e.g. from cookie_header()."""
+        started = time.perf_counter()
+        with spans.span("http.fetch"):
+            response = self.http.request("GET", url, headers={"Cookie": cookies} if cookies else None)
+        load_ms = (time.perf_counter() - started) * 1000
+        content_type = response.headers.get("Content-Type", "")
+        charset = CHARSET_RE.search(content_type)
+        try:
+            html = response.data.decode(charset.group(1) if charset else "utf-8", errors="replace")
+        except LookupError:
+            html = response.data.decode("utf-8", errors="replace")
+        # Redirects are followed; urllib3 2.x exposes the final URL as .url, 1.26 through geturl()
+        final_url = urljoin(url, getattr(response, "url", None) or response.geturl() or url)
+        return StaticPage(final_url, response.status, content_type, html, load_ms, len(response.data))
+
+    def record(self, outcome):
+        with self._lock:
+            self.stats[outcome] += 1
+
+
+_shared_fetcher = None
+_shared_fetcher_lock = threading.Lock()
+
+
+def get_http_fetcher() -> HttpFetcher:
+    global _shared_fetcher
+    with _shared_fetcher_lock:
+        if _shared_fetcher is None:
+            _shared_fetcher = HttpFetcher()
+        return _shared_fetcher
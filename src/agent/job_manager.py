@@ -0,0 +1,218 @@
+import contextlib
+import contextvars
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from config.constants import (
+    CPROFILE_DIR,
+    MAX_BROWSERS,
+    MAX_CONCURRENT_JOBS,
+    MAX_FINISHED_JOBS,
+    broadcast_log,
+    log_bus,
+)
+from config.log_bus import bind_job
+from config.metrics import cprofile_to
+from agent.browser_gym_env import BrowserGymEnv
+from agent.checkpoint import CheckpointStore, checkpoint_path_for
+from agent.driver_pool import get_driver_pool
+from agent.llm_planner import BedrockLLM
+from agent.parallel_explorer import ParallelExplorer
+from agent.reward_pipeline import RewardPipeline
+from agent.rl_agent import DumbAgent
+
+ACTIVE_STATUSES = ("queued", "running", "stopping")
+
+
+class TrainingJob:
+    """One submitted crawl: its settings, lifecycle status and a private log channel."""
+
+    def __init__(self, job_id, start_url, episodes=10, use_llm=True, max_obs_tokens=5000, workers=1,
+                 async_rewards=False, resume=False, profile=None, cprofile=False):
+        self.id = job_id
+        self.start_url = start_url
+        self.episodes = episodes
+        self.use_llm = use_llm
+        self.max_obs_tokens = max_obs_tokens
+        self.workers = workers
+        self.async_rewards = async_rewards
+        self.resume = resume
+        self.profile = profile
+        self.cprofile = cprofile
+
+        self.status = "queued"
+        self.error = None
+        self.agent = None
+        self.stop_requested = False
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.log = log_bus.subscribe(job_id=job_id)
+
+    def stop(self):
+        self.stop_requested = True
+        if self.agent is not None:
+            self.agent.stop()
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "start_url": self.start_url,
+            "episodes": self.episodes,
+            "workers": self.workers,
+            "profile": self.profile,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "dropped_logs": self.log.dropped,
+        }
+
+
+class JobManager:
+    """Queues training jobs and runs them under process-wide resource limits.
+
+    At most max_jobs jobs run at once and together they hold at most max_browsers browsers
+    (a job needs one per worker). Jobs start in submission order as capacity frees up; each
+    runs on its own thread with its log lines tagged with, and routed to, its job id.
+    """
+
+    def __init__(self, max_jobs=MAX_CONCURRENT_JOBS, max_browsers=MAX_BROWSERS, max_finished=MAX_FINISHED_JOBS):
+        self.max_jobs = max_jobs
+        self.max_browsers = max_browsers
+        self.max_finished = max_finished
+        self._jobs = OrderedDict()
+        self._queue = deque()
+        self._running = 0
+        self._browsers_in_use = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, start_url, **settings) -> TrainingJob:
+        if settings.get("workers", 1) < 1:
+            # Zero workers would hold no browsers and never run; negative ones would inflate capacity
+            raise ValueError(f"workers must be at least 1, got {settings['workers']}")
+        with self._lock:
+            for job in self._jobs.values():
+                if job.start_url == start_url and job.status in ACTIVE_STATUSES:
+                    # Same start URL means the same checkpoint files
+                    raise ValueError(f"Job {job.id} is already crawling {start_url}")
+            job = TrainingJob(str(next(self._ids)), start_url, **settings)
+            if job.workers > self.max_browsers:
+                job.workers = self.max_browsers
+            self._jobs[job.id] = job
+            self._queue.append(job)
+            self._prune()
+            self._dispatch()
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> list:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def stop(self, job_id) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status not in ACTIVE_STATUSES:
+                return False
+            if job.status == "queued":
+                self._queue.remove(job)
+                job.status = "cancelled"
+                job.finished_at = time.time()
+            else:
+                job.status = "stopping"
+            job.stop()
+            return True
+
+    def stop_all(self) -> int:
+        return sum(self.stop(job.id) for job in self.jobs())
+
+    def _dispatch(self):
+        # Strict FIFO: a large job at the head waits for browsers rather than being starved
+        while self._queue and self._running < self.max_jobs:
+            job = self._queue[0]
+            if self._browsers_in_use + job.workers > self.max_browsers:
+                return
+            self._queue.popleft()
+            self._running += 1
+            self._browsers_in_use += job.workers
+            job.status = "running"
+            job.started_at = time.time()
+            threading.Thread(target=contextvars.Context().run, args=(self._run, job),
+                             name=f"training-job-{job.id}", daemon=True).start()
+
+    def _prune(self):
+        finished = [j for j in self._jobs.values() if j.status not in ACTIVE_STATUSES]
+        for job in finished[:max(len(finished) - self.max_finished, 0)]:
+            log_bus.unsubscribe(job.log)
+            del self._jobs[job.id]
+
+    def _run(self, job):
+        with bind_job(job.id):
+            broadcast_log(f"🚀 Starting training on {job.start_url}")
+            try:
+                self._train(job)
+            except Exception as e:
+                job.error = str(e)
+                broadcast_log(f"❌ Training failed: {e}")
+            finally:
+                with self._lock:
+                    job.status = "failed" if job.error else "stopped" if job.stop_requested else "finished"
+                    job.finished_at = time.time()
+                    self._running -= 1
+                    self._browsers_in_use -= job.workers
+                    self._prune()
+                    self._dispatch()
+                if job.status == "finished":
+                    broadcast_log("✅ Training complete.")
+
+    def _train(self, job):
+        # Launch the job's browsers in parallel while the agent is set up; checkouts wait for them
+        prewarm = get_driver_pool(job.profile).prewarm
+        threading.Thread(target=contextvars.copy_context().run, args=(prewarm, job.workers),
+                         name=f"prewarm-job-{job.id}", daemon=True).start()
+        llm = BedrockLLM() if job.use_llm else None
+        reward_pipeline = RewardPipeline() if job.async_rewards else None
+
+        def make_env():
+            return BrowserGymEnv(use_llm=job.use_llm, llm=llm, start_url=job.start_url,
+                                 max_obs_tokens=job.max_obs_tokens, profile=job.profile)
+
+        env = checkpoint = None
+        try:
+            if job.workers > 1:
+                job.agent = ParallelExplorer(make_env, num_workers=job.workers, reward_pipeline=reward_pipeline)
+            else:
+                checkpoint = CheckpointStore(checkpoint_path_for(job.start_url))
+                if not job.resume:
+                    checkpoint.clear()
+                env = make_env()
+                job.agent = DumbAgent(llm_ins=llm, reward_pipeline=reward_pipeline, checkpoint=checkpoint)
+                if job.resume and not job.agent.restore_checkpoint():
+                    broadcast_log(f"⚠️ No checkpoint found for {job.start_url}; starting a fresh crawl.")
+            if job.stop_requested:
+                job.agent.stop()
+
+            profile_path = os.path.join(CPROFILE_DIR, f"job-{job.id}-{time.strftime('%Y%m%d-%H%M%S')}.prof")
+            # cProfile follows only this thread; parallel workers show up as time spent joining them
+            with cprofile_to(profile_path) if job.cprofile else contextlib.nullcontext():
+                if job.workers > 1:
+                    job.agent.run(use_llm=job.use_llm)
+                else:
+                    job.agent.run(env, episodes=job.episodes, use_llm=job.use_llm)
+            if job.cprofile:
+                broadcast_log(f"🔬 Profile written to {profile_path}")
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+            if env is not None:
+                env.close()
+            if reward_pipeline is not None:
+                reward_pipeline.close()
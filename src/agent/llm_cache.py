@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from config.constants import LLM_CACHE_PATH, LLM_CACHE_MEMORY_ENTRIES, LLM_CACHE_DISK_ENTRIES, LLM_CACHE_TTL
+
+
+class LLMResponseCache:
+    """Two-tier (in-memory LRU + on-disk SQLite) cache of LLM completions.
+
+    Entries are keyed by a content hash of the model id and the full request body, so any change
+    to the prompt or sampling parameters is a miss. Both tiers honour the same TTL; the memory
+    tier is bounded by entry count and the disk tier evicts its oldest entries past its limit.
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, max_memory_entries=LLM_CACHE_MEMORY_ENTRIES,
+                 max_disk_entries=LLM_CACHE_DISK_ENTRIES, ttl=LLM_CACHE_TTL):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self._memory = OrderedDict()  # key -> (created_at, completion)
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS completions "
+                "(key TEXT PRIMARY KEY, created_at REAL NOT NULL, completion TEXT NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS completions_created_at ON completions (created_at)")
+            self._db.commit()
+
+    @staticmethod
+    def make_key(model_id: str, body: dict) -> str:
+        payload = json.dumps({"model_id": model_id, "body": body}, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _expired(self, created_at, now):
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[0], now):
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return entry[1]
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT created_at, completion FROM completions WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if not self._expired(row[0], now):
+                        self._remember(key, row[0], row[1])
+                        self.stats["disk_hits"] += 1
+                        return row[1]
+                    self._db.execute("DELETE FROM completions WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key, completion: str):
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, completion)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO completions (key, created_at, completion) VALUES (?, ?, ?)",
+                    (key, now, completion),
+                )
+                self._evict_disk(now)
+                self._db.commit()
+
+    def _remember(self, key, created_at, completion):
+        self._memory[key] = (created_at, completion)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _evict_disk(self, now):
+        if self.ttl is not None:
+            self._db.execute("DELETE FROM completions WHERE created_at < ?", (now - self.ttl,))
+        (count,) = self._db.execute("SELECT COUNT(*) FROM completions").fetchone()
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM completions WHERE key IN "
+                "(SELECT key FROM completions ORDER BY created_at LIMIT ?)",
+                (overflow,),
+            )
+            self.stats["evictions"] += overflow
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM completions")
+                self._db.commit()
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Returns the process-wide cache shared by all BedrockLLM instances."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = LLMResponseCache()
+        return _shared_cache
@@ -1,47 +1,258 @@
+import contextvars
 import json
-import time
+import operator
+import threading
 
 import boto3
+from botocore.exceptions import ClientError
 
-from config.constants import get_bedrock_client
+from config.constants import get_bedrock_client, LLM_CONTEXT_TOKEN_BUDGET
+from config.metrics import spans, timed
+from agent.llm_cache import get_llm_cache
+from agent.rate_limiter import get_rate_limiter
+from agent.dom_distiller import distill_context
+
+THROTTLING_ERROR_CODES = {"ThrottlingException", "TooManyRequestsException", "ServiceQuotaExceededException"}
+
+
+def is_throttling_error(error: Exception) -> bool:
+    return isinstance(error, ClientError) and error.response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+
+
+def parse_action_line(line: str):
+    """Returns the action a completion line names ("type:name:value", "click_button:..", ...) or None."""
+    line = line.strip().lower()
+    if line.startswith("type:") and line.count(":") == 2:
+        return line
+    if line.startswith("click_button:") or line.startswith("click_link:"):
+        return line
+    return None
+
+
+def iter_completion_deltas(stream):
+    """Completion text fragments from an invoke_model_with_response_stream body."""
+    for event in stream:
+        chunk = event.get("chunk")
+        if chunk is None:
+            # Modelled errors (throttlingException, modelStreamErrorException, ...) arrive as events
+            name, detail = next(iter(event.items()), ("unknown", {}))
+            raise RuntimeError(f"Bedrock stream error {name}: {detail}")
+        yield json.loads(chunk["bytes"]).get("completion", "")
+
+
+class ActionLineParser:
+    """Turns streamed completion text into actions, one per completed line."""
+
+    def __init__(self):
+        self._pending = ""
+
+    def feed(self, text) -> list:
+        lines = (self._pending + text).split("\n")
+        self._pending = lines.pop()
+        return [action for action in map(parse_action_line, lines) if action]
+
+    def flush(self) -> list:
+        line, self._pending = self._pending, ""
+        action = parse_action_line(line)
+        return [action] if action else []
+
+
+class StreamingPlan:
+    """List-like action plan that fills in from a background stream.
+
+    Iterating yields each action as soon as it arrives, so the agent can start executing the
+    first one while the model is still generating the rest. plan[i] and bool(plan) likewise
+    wait only for the actions they need; len(), slices and result() wait for the stream to
+    finish. If the stream produces no actions, fallback is used instead.
+    """
+
+    def __init__(self, actions, fallback=(), on_complete=None):
+        self._actions = []
+        self._fallback = list(fallback)
+        self._on_complete = on_complete
+        self._source = actions
+        self._ready = threading.Condition()
+        self._cancelled = False
+        self.done = False
+        self.error = None
+        # Carry the caller's context so log lines keep their job tag
+        threading.Thread(target=contextvars.copy_context().run, args=(self._consume,), name="llm-stream",
+                         daemon=True).start()
+
+    def _consume(self):
+        try:
+            for action in self._source:
+                with self._ready:
+                    if self._cancelled:
+                        break
+                    self._actions.append(action)
+                    self._ready.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            close = getattr(self._source, "close", None)
+            if close is not None:
+                close()  # Stops reading and releases the HTTP stream if we bailed out early
+            with self._ready:
+                streamed = list(self._actions)
+                if not self._actions:
+                    self._actions = self._fallback
+                self.done = True
+                self._ready.notify_all()
+            if self._on_complete is not None and not self._cancelled:
+                self._on_complete(streamed, self.error)
+
+    def cancel(self):
+        with self._ready:
+            self._cancelled = True
+
+    def __iter__(self):
+        i = 0
+        while True:
+            with self._ready:
+                while i >= len(self._actions) and not self.done:
+                    self._ready.wait()
+                if i >= len(self._actions):
+                    return
+                action = self._actions[i]
+            yield action
+            i += 1
+
+    def result(self) -> list:
+        with self._ready:
+            while not self.done:
+                self._ready.wait()
+            return list(self._actions)
+
+    def _wait_for(self, count):
+        # Until count actions have arrived or the stream has ended, whichever comes first
+        with self._ready:
+            while len(self._actions) < count and not self.done:
+                self._ready.wait()
+            return self._actions
+
+    def __len__(self):
+        return len(self.result())
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            index = operator.index(index)  # Also NumPy ints from vector envs
+            if index >= 0:
+                return self._wait_for(index + 1)[index]  # IndexError only once the stream has ended
+        return self.result()[index]
+
+    def __bool__(self):
+        return bool(self._wait_for(1))
 
 
 class BedrockLLM:
-    def __init__(self, model_id="anthropic.claude-v2"):
+    def __init__(self, model_id="anthropic.claude-v2", cache=None, rate_limiter=None,
+                 context_token_budget=LLM_CONTEXT_TOKEN_BUDGET, client=None):
         self.model_id = model_id
-        self.client = get_bedrock_client()
+        self.context_token_budget = context_token_budget
+        self.client = client or get_bedrock_client()
+        self.cache = cache or get_llm_cache()
+        self.rate_limiter = rate_limiter or get_rate_limiter()
 
-    def query(self, prompt: str, dom: str = "", css: str = "", js: str = "") -> str:
-        time.sleep(2)  # ⏳ Throttle to prevent Bedrock API limits
+    @staticmethod
+    def estimate_tokens(body: dict) -> int:
+        # ~4 characters per token for the prompt, plus the completion budget
+        return len(body["prompt"]) // 4 + body["max_tokens_to_sample"]
 
-        # Add DOM, CSS, and JS context for more accurate suggestions
+    def _request_body(self, prompt, dom, css, js, max_tokens=300) -> dict:
+        # Add a distilled view of the page (interactive elements, relevant JS/CSS) for more accurate suggestions
+        context = distill_context(dom, css, js, token_budget=self.context_token_budget)
+        context_block = f"{context}\n\n" if context else ""
         full_prompt = (
-            f"You are a web automation assistant. Your job is to examine a webpage's DOM, CSS, and JS, and suggest "
+            f"You are a web automation assistant. Your job is to examine a webpage's interactive elements and suggest "
             f"precise, sequential user actions to explore or test the page. Respond only with a list of exact actions "
             f"(like 'type:username:myuser', 'type:password:123456', 'click_button:Login') in order of execution.\n\n"
-            f"--- DOM ---\n{dom[:3000]}\n\n"
-            f"--- CSS ---\n{css[:1500]}\n\n"
-            f"--- JS ---\n{js[:1500]}\n\n"
+            f"{context_block}"
             f"--- Prompt ---\n{prompt}\n"
         )
 
-        body = {
+        return {
             "prompt": f"\n\nHuman: {full_prompt}\n\nAssistant:",
-            "max_tokens_to_sample": 300,
+            "max_tokens_to_sample": max_tokens,
             "temperature": 0.7,
             "top_k": 250,
             "top_p": 0.99,
             "stop_sequences": ["\n\nHuman:"],
         }
 
-        response = self.client.invoke_model(
-            modelId=self.model_id,
-            contentType="application/json",
-            accept="application/json",
-            body=json.dumps(body),
-        )
-        result = json.loads(response["body"].read())
-        return result["completion"]
+    @timed("llm.query")
+    def query(self, prompt: str, dom: str = "", css: str = "", js: str = "", use_cache: bool = True,
+              max_tokens: int = 300) -> str:
+        """Returns the completion for prompt; pass use_cache=False to force a fresh completion."""
+        body = self._request_body(prompt, dom, css, js, max_tokens)
+        key = self.cache.make_key(self.model_id, body)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        def invoke():
+            response = self.client.invoke_model(
+                modelId=self.model_id,
+                contentType="application/json",
+                accept="application/json",
+                body=json.dumps(body),
+            )
+            return json.loads(response["body"].read())
+
+        # ⏳ Shared budget instead of a fixed sleep; backs off on real throttling responses
+        with spans.span("llm.invoke"):  # Cache misses only, including rate-limit waits
+            result = self.rate_limiter.call(invoke, tokens=self.estimate_tokens(body), is_throttle=is_throttling_error)
+        completion = result["completion"]
+        self.cache.put(key, completion)
+        return completion
+
+    def query_stream(self, prompt: str, dom: str = "", css: str = "", js: str = "", max_actions=None,
+                     use_cache: bool = True):
+        """Yields actions from the completion as each line of it streams in.
+
+        Reading stops, and the stream is closed, once max_actions actions have arrived or the
+        caller closes the generator. Only completions that were read to the end are cached.
+        """
+        body = self._request_body(prompt, dom, css, js)
+        key = self.cache.make_key(self.model_id, body)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield from self.resolve_llm_suggestion(cached, valid_actions=[])[:max_actions]
+                return
+
+        def invoke():
+            return self.client.invoke_model_with_response_stream(
+                modelId=self.model_id,
+                contentType="application/json",
+                accept="application/json",
+                body=json.dumps(body),
+            )
+
+        with spans.span("llm.invoke"):  # Until the stream opens, including rate-limit waits
+            response = self.rate_limiter.call(invoke, tokens=self.estimate_tokens(body), is_throttle=is_throttling_error)
+        stream = response["body"]
+        parser = ActionLineParser()
+        text = []
+        count = 0
+        completed = False
+        try:
+            for delta in iter_completion_deltas(stream):
+                text.append(delta)
+                for action in parser.feed(delta):
+                    yield action
+                    count += 1
+                    if max_actions and count >= max_actions:
+                        return
+            for action in parser.flush():
+                yield action
+            completed = True
+        finally:
+            if completed:
+                self.cache.put(key, "".join(text))
+            elif hasattr(stream, "close"):
+                stream.close()
 
     # @staticmethod
     # def resolve_llm_suggestion(text: str, valid_actions: list[str]) -> list[str]:
@@ -68,16 +279,7 @@ class BedrockLLM:
     #     return selected[:10]
     @staticmethod
     def resolve_llm_suggestion(text: str, valid_actions: list[str]) -> list[str]:
-        selected = []
-        text = text.lower().strip()
-        lines = [l.strip() for l in text.split("\n") if l.strip()]
-
-        for line in lines:
-            if line.startswith("type:") and line.count(":") == 2:
-                selected.append(line)
-            elif line.startswith("click_button:") or line.startswith("click_link:"):
-                selected.append(line)
-            # You can add other rules like `select:dropdown:value`, etc.
-
+        selected = [action for action in map(parse_action_line, text.split("\n")) if action]
+        # You can add other rules like `select:dropdown:value`, etc. in parse_action_line
         return selected[:20]  # allow longer plans
 
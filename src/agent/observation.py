@@ -0,0 +1,82 @@
+import re
+import zlib
+
+import numpy as np
+from gymnasium import spaces
+
+# One match per whitespace-separated token after padding "<" and ">" with spaces, i.e. what
+# " ".join(html.replace("<", " <").replace(">", "> ").split()) would produce
+DOM_TOKEN_RE = re.compile(r"<[^\s<>]*>?|[^\s<>]+>?|>")
+TAG_RE = re.compile(r"<([a-zA-Z][a-zA-Z0-9-]*)")
+ATTR_RE = re.compile(r"\s([a-zA-Z_:][a-zA-Z0-9_:.-]*)\s*=")
+
+
+def dom_to_token_string(html: str, limit: int = None) -> str:
+    """Normalises whitespace around tags, stopping once limit characters have been produced."""
+    if limit is None:
+        return " ".join(DOM_TOKEN_RE.findall(html))
+    parts = []
+    length = 0
+    for match in DOM_TOKEN_RE.finditer(html):
+        token = match.group()
+        parts.append(token)
+        length += len(token) + 1
+        if length > limit:
+            break
+    return " ".join(parts)[:limit]
+
+
+class CharObservationEncoder:
+    """Encodes the normalised DOM as one byte per character (code points clipped to 255).
+
+    Writes into a buffer that is reused between calls, so callers that keep observations
+    across steps must copy them.
+    """
+
+    def __init__(self, max_obs_tokens):
+        self.max_obs_tokens = max_obs_tokens
+        self.space = spaces.Box(low=0, high=255, shape=(max_obs_tokens,), dtype=np.uint8)
+        self._buffer = np.zeros(max_obs_tokens, dtype=np.uint8)
+
+    def encode(self, dom: str) -> np.ndarray:
+        text = dom_to_token_string(dom, self.max_obs_tokens)
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype="<u4")
+        n = len(codes)
+        np.minimum(codes, 255, out=self._buffer[:n], casting="unsafe")
+        self._buffer[n:] = 0
+        return self._buffer
+
+
+class HashedObservationEncoder:
+    """Compact, fixed-size observation: hashed counts of tag and attribute names.
+
+    Cost and size no longer depend on how much of the DOM fits in max_obs_tokens, and pages
+    that share a structure map to similar vectors. Shares the reused-buffer caveat above.
+    """
+
+    def __init__(self, num_features=512):
+        self.num_features = num_features
+        self.space = spaces.Box(low=0, high=255, shape=(num_features,), dtype=np.uint8)
+        self._buffer = np.zeros(num_features, dtype=np.uint8)
+        self._slots = {}  # feature -> bucket, so each distinct feature is hashed once
+
+    def _slot(self, feature):
+        slot = self._slots.get(feature)
+        if slot is None:
+            slot = self._slots[feature] = zlib.crc32(feature.encode("utf-8")) % self.num_features
+        return slot
+
+    def encode(self, dom: str) -> np.ndarray:
+        slots = [self._slot("tag:" + t.lower()) for t in TAG_RE.findall(dom)]
+        slots += [self._slot("attr:" + a.lower()) for a in ATTR_RE.findall(dom)]
+        counts = np.bincount(np.asarray(slots, dtype=np.intp), minlength=self.num_features)
+        np.minimum(counts, 255, out=self._buffer, casting="unsafe")
+        return self._buffer
+
+
+def make_observation_encoder(mode, max_obs_tokens, num_features=512):
+    if mode == "chars":
+        return CharObservationEncoder(max_obs_tokens)
+    if mode == "hashed":
+        return HashedObservationEncoder(num_features)
+    raise ValueError(f"Unknown observation mode: {mode}")
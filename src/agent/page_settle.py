@@ -0,0 +1,107 @@
+import time
+
+from selenium.common.exceptions import UnexpectedAlertPresentException
+
+from config.constants import SETTLE_STRATEGY, SETTLE_QUIET_MS, SETTLE_TIMEOUT, SETTLE_POLL_MS
+
+# Tracks DOM mutations and in-flight fetch/XHR requests for the current document
+SETTLE_INSTRUMENT_JS = """
+    if (!window.__usersimSettle) {
+        const s = window.__usersimSettle = {pending: 0, lastMutation: Date.now()};
+        if (window.fetch) {
+            const origFetch = window.fetch;
+            window.fetch = function() {
+                s.pending++;
+                return origFetch.apply(this, arguments).finally(() => { s.pending--; });
+            };
+        }
+        const origSend = XMLHttpRequest.prototype.send;
+        XMLHttpRequest.prototype.send = function() {
+            let open = true;
+            const finish = () => { if (open) { open = false; s.pending--; } };
+            s.pending++;
+            this.addEventListener("loadend", finish, {once: true});
+            try {
+                return origSend.apply(this, arguments);
+            } catch (e) {
+                finish();  // Threw before the request started (invalid state, CSP, mixed content): no loadend
+                throw e;
+            }
+        };
+        new MutationObserver(() => { s.lastMutation = Date.now(); })
+            .observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+    }
+"""
+
+# Resolves as soon as the page is complete, quiet and has no pending requests (or on timeout)
+SETTLE_WAIT_JS = SETTLE_INSTRUMENT_JS + """
+    const quietMs = arguments[0], timeoutMs = arguments[1], pollMs = arguments[2];
+    const done = arguments[arguments.length - 1];
+    const s = window.__usersimSettle;
+    const start = Date.now();
+    (function check() {
+        const now = Date.now();
+        const settled = document.readyState === "complete"
+            && now - s.lastMutation >= quietMs
+            && s.pending <= 0;
+        if (settled || now - start >= timeoutMs) {
+            done(settled);
+        } else {
+            setTimeout(check, pollMs);
+        }
+    })();
+"""
+
+
+class PageSettler:
+    """Waits for a page to become ready after a navigation or action.
+
+    The "event" strategy combines document.readyState, a MutationObserver quiet window and a
+    pending fetch/XHR counter, returning as soon as all three agree. The "fixed" strategy keeps
+    the old behaviour of sleeping for a constant delay.
+    """
+
+    def __init__(self, strategy=SETTLE_STRATEGY, quiet_ms=SETTLE_QUIET_MS, timeout=SETTLE_TIMEOUT,
+                 poll_ms=SETTLE_POLL_MS, fixed_delay=1.0):
+        if strategy not in ("event", "fixed"):
+            raise ValueError(f"Unknown settle strategy: {strategy}")
+        self.strategy = strategy
+        self.quiet_ms = quiet_ms
+        self.timeout = timeout
+        self.poll_ms = poll_ms
+        self.fixed_delay = fixed_delay
+
+    def attach(self, driver):
+        if self.strategy != "event":
+            return
+        driver.set_script_timeout(self.timeout + 1)
+        if getattr(driver, "_usersim_settle_attached", False):
+            return  # Pooled drivers keep the instrumentation across checkouts
+        try:
+            # Instrument every new document before its own scripts run so early requests are counted
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": SETTLE_INSTRUMENT_JS})
+        except Exception:
+            pass  # Non-Chromium drivers fall back to instrumenting lazily in wait()
+        driver._usersim_settle_attached = True
+
+    def wait(self, driver) -> float:
+        """Blocks until the page settles and returns the seconds spent waiting."""
+        start = time.perf_counter()
+        if self.strategy == "fixed":
+            time.sleep(self.fixed_delay)
+            return time.perf_counter() - start
+
+        deadline = start + self.timeout
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                driver.execute_async_script(SETTLE_WAIT_JS, self.quiet_ms, int(remaining * 1000), self.poll_ms)
+                break
+            except UnexpectedAlertPresentException:
+                break  # Alerts are handled by the caller
+            except Exception:
+                # The document was replaced mid-wait (navigation); retry on the new page
+                time.sleep(self.poll_ms / 1000)
+        return time.perf_counter() - start
@@ -0,0 +1,115 @@
+import contextvars
+import threading
+
+from config.constants import broadcast_log
+from agent.rl_agent import DumbAgent
+from agent.shared_state import SharedExplorationState
+from agent.fingerprint import StateIndex
+
+
+class ParallelExplorer:
+    """Runs several browser workers against one shared exploration frontier.
+
+    Each worker owns its own BrowserGymEnv (and therefore its own Chrome) and a DumbAgent that
+    shares exploration state with the others. Workers claim whole URLs from the frontier and
+    individual actions from the shared state, so nothing is explored twice. Threads are enough
+    here: workers spend nearly all of their time blocked on WebDriver and LLM I/O.
+    """
+
+    def __init__(self, env_factory, num_workers=4, max_steps_per_url=50, reward_pipeline=None):
+        self.env_factory = env_factory
+        self.reward_pipeline = reward_pipeline
+        self.num_workers = num_workers
+        self.max_steps_per_url = max_steps_per_url
+        self.shared = SharedExplorationState()
+        self.state_index = StateIndex()
+        self.template_plans = {}
+        self.agents = []
+        self.should_stop = False
+        self._agents_lock = threading.Lock()
+
+    def stop(self):
+        self.should_stop = True
+        with self._agents_lock:
+            for agent in self.agents:
+                agent.stop()
+
+    def run(self, use_llm=False):
+        threads = [
+            threading.Thread(target=contextvars.copy_context().run, args=(self._worker, i, use_llm),
+                             name=f"explorer-{i}")
+            for i in range(self.num_workers)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for agent in self.agents:
+            agent.finish_pending_rewards()
+
+        summary = self.summary_agent()
+        summary.print_summary()
+        return summary.metrics
+
+    def summary_agent(self) -> DumbAgent:
+        """Returns an agent view over the shared state with every worker's metrics merged in."""
+        summary = DumbAgent(shared_state=self.shared)
+        with self._agents_lock:
+            for agent in self.agents:
+                summary.merge_metrics(agent.metrics)
+                summary.profile = summary.profile or agent.profile
+        return summary
+
+    def _worker(self, idx, use_llm):
+        env = None
+        try:
+            env = self.env_factory()
+            # Workers recognise each other's templates and reuse each other's plans
+            env.state_index = self.state_index
+            env.template_plans = self.template_plans
+            agent = DumbAgent(llm_ins=env.llm, shared_state=self.shared, reward_pipeline=self.reward_pipeline)
+            agent.profile = env.profile
+            with self._agents_lock:
+                self.agents.append(agent)
+                if self.should_stop:
+                    agent.stop()
+
+            env.reset()
+            self.shared.add_url(env.current_url)
+            broadcast_log(f"🧵 Worker {idx} ready")
+
+            while not agent.should_stop:
+                url = self.shared.claim_url()
+                if url is None:
+                    if self.shared.is_idle():
+                        break
+                    continue
+                try:
+                    self._explore_url(env, agent, url, use_llm)
+                except Exception as e:
+                    broadcast_log(f"⚠️ Worker {idx} failed while exploring {url}: {e}")
+                finally:
+                    self.shared.release_url(url)
+        finally:
+            if env is not None:
+                env.close()
+            broadcast_log(f"🧵 Worker {idx} finished")
+
+    def _explore_url(self, env, agent, url, use_llm):
+        total_reward = 0
+        steps = 0
+        for _ in range(self.max_steps_per_url):
+            if agent.should_stop:
+                break
+            if env.current_url != url:
+                env.navigate(url)
+
+            r = agent.step(env, use_llm=use_llm)
+            for visited in list(env.visited_urls):
+                self.shared.add_url(visited)
+            if agent.url_exhausted:
+                break  # Nothing left to claim on this URL
+            total_reward += r
+            steps += 1
+
+        agent.record_episode(total_reward, steps)
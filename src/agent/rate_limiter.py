@@ -0,0 +1,118 @@
+import random
+import threading
+import time
+
+from config.constants import (
+    BEDROCK_REQUESTS_PER_SEC,
+    BEDROCK_TOKENS_PER_MIN,
+    BEDROCK_MAX_RETRIES,
+    BEDROCK_BACKOFF_BASE,
+    BEDROCK_BACKOFF_MAX,
+    BEDROCK_MAX_CONCURRENCY,
+    broadcast_log,
+)
+
+
+class ThrottledError(Exception):
+    """Raised when a call is still throttled after every retry."""
+
+
+class TokenBucket:
+    def __init__(self, rate_per_sec: float, capacity: float):
+        self.rate = rate_per_sec
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now) -> float:
+        """Seconds until amount is available (0 if it already is)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """Process-wide request and token budget with jittered exponential backoff.
+
+    Calls go straight through while both buckets have budget. When the service reports
+    throttling, every caller pauses until the backoff window has passed, so concurrent
+    training runs back off together instead of hammering the endpoint. At most max_concurrency
+    calls are in flight at once, however many jobs are running.
+    """
+
+    def __init__(self, requests_per_sec=BEDROCK_REQUESTS_PER_SEC, tokens_per_min=BEDROCK_TOKENS_PER_MIN,
+                 max_retries=BEDROCK_MAX_RETRIES, backoff_base=BEDROCK_BACKOFF_BASE, backoff_max=BEDROCK_BACKOFF_MAX,
+                 max_concurrency=BEDROCK_MAX_CONCURRENCY):
+        self.requests = TokenBucket(requests_per_sec, max(1.0, requests_per_sec))
+        self.tokens = TokenBucket(tokens_per_min / 60.0, tokens_per_min)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._blocked_until = 0.0
+        self.stats = {"calls": 0, "throttled": 0, "waited": 0.0}
+
+    def acquire(self, tokens=0):
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                delay = max(
+                    self._blocked_until - now,
+                    self.requests.wait_time(1, now),
+                    self.tokens.wait_time(tokens, now),
+                )
+                if delay <= 0:
+                    self.requests.consume(1)
+                    self.tokens.consume(tokens)
+                    self.stats["calls"] += 1
+                    self.stats["waited"] += waited
+                    return waited
+            time.sleep(delay)
+            waited += delay
+
+    def backoff(self, attempt) -> float:
+        """Registers a throttling response and returns the (full-jitter) pause it imposes."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+            self.stats["throttled"] += 1
+        return delay
+
+    def call(self, fn, tokens=0, is_throttle=lambda e: False):
+        """Runs fn under the budget, retrying with backoff while is_throttle(error) holds."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self._slots:
+                    self.acquire(tokens)
+                    return fn()
+            except Exception as e:
+                if not is_throttle(e):
+                    raise
+                if attempt == self.max_retries:
+                    raise ThrottledError(f"Still throttled after {self.max_retries} retries") from e
+                delay = self.backoff(attempt)
+                broadcast_log(f"🐢 Throttled by LLM service, backing off {delay:.1f}s (attempt {attempt + 1})")
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Returns the limiter shared by every BedrockLLM in this process."""
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter()
+        return _shared_limiter
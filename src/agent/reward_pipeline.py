@@ -0,0 +1,118 @@
+import contextvars
+import queue
+import threading
+import time
+
+from config.constants import REWARD_BATCH_SIZE, REWARD_BATCH_MAX_WAIT, broadcast_log
+
+
+class RewardPipeline:
+    """Scores captured transitions on a background worker pool.
+
+    The agent submits (scorer, transition, callback) and keeps stepping the browser; a worker
+    calls scorer(transition) and hands the reward to callback once it resolves. The queue is
+    bounded, so submit() blocks (back-pressure) if scoring falls too far behind.
+
+    With batch_size > 1, a worker collects up to batch_size transitions (waiting at most
+    max_wait seconds after the first) and hands those sharing a batch_scorer to it in one
+    call, trading a little latency for fewer, larger LLM requests.
+    """
+
+    def __init__(self, num_workers=2, max_pending=32, batch_size=REWARD_BATCH_SIZE, max_wait=REWARD_BATCH_MAX_WAIT):
+        self.num_workers = num_workers
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._threads = []
+        self._started = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            for i in range(self.num_workers):
+                # Scoring logs stay attributed to the job that submitted the work
+                t = threading.Thread(target=contextvars.copy_context().run, args=(self._worker,),
+                                     name=f"reward-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+            self._started = True
+
+    def submit(self, scorer, transition, callback, batch_scorer=None):
+        """batch_scorer(transitions) -> rewards, if given, lets transitions be scored together."""
+        self.start()
+        self._queue.put((scorer, transition, callback, batch_scorer))
+
+    def join(self):
+        """Blocks until every submitted transition has been scored."""
+        self._queue.join()
+
+    def close(self):
+        self.join()
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join()
+        self._threads = []
+        self._started = False
+
+    def _worker(self):
+        while True:
+            items, stop = self._next_batch()
+            try:
+                self._score(items)
+            finally:
+                for _ in range(len(items) + stop):
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _next_batch(self):
+        """Blocks for one item, then gathers up to batch_size within max_wait; (items, saw sentinel)."""
+        item = self._queue.get()
+        if item is None:
+            return [], True
+        items = [item]
+        deadline = time.monotonic() + self.max_wait
+        while len(items) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return items, True
+            items.append(item)
+        return items, False
+
+    def _score(self, items):
+        groups = {}
+        for item in items:
+            batch_scorer = item[3] if len(items) > 1 else None
+            groups.setdefault(batch_scorer, []).append(item)
+
+        for batch_scorer, group in groups.items():
+            if batch_scorer is not None and len(group) > 1:
+                try:
+                    rewards = batch_scorer([transition for _, transition, _, _ in group])
+                except Exception as e:
+                    broadcast_log(f"⚠️ Batched reward scoring failed: {e}")
+                    rewards = [-0.1] * len(group)
+            else:
+                rewards = [self._score_one(scorer, transition) for scorer, transition, _, _ in group]
+            for (_, _, callback, _), reward in zip(group, rewards):
+                try:
+                    callback(reward)
+                except Exception as e:
+                    broadcast_log(f"⚠️ Reward callback failed: {e}")
+
+    @staticmethod
+    def _score_one(scorer, transition):
+        try:
+            return scorer(transition)
+        except Exception as e:
+            broadcast_log(f"⚠️ Background reward scoring failed: {e}")
+            return -0.1
@@ -1,23 +1,51 @@
+import sys
+import threading
+from array import array
 from collections import defaultdict
-from config.constants import broadcast_log
+from config.constants import broadcast_log, log_debug
+from config.metrics import spans, timed
+from agent.shared_state import SharedExplorationState
+from agent.scheduler import ExplorationScheduler
+from agent.exploration_tracker import BUTTON, INPUT, LINK
+from agent.history import TransitionHistory
+from agent.llm_planner import StreamingPlan
 
 
 class DumbAgent:
-    def __init__(self, llm_ins=None):
+    def __init__(self, llm_ins=None, shared_state=None, reward_pipeline=None, scheduler=None, checkpoint=None):
         self.llm = llm_ins
-        self.memory = []
+        self.memory = TransitionHistory()
         self.should_stop = False
         self.generated_stories = set()
-        self.llm_action_memory = defaultdict(list)       # URL -> list of all LLM-suggested actions
-        self.completed_actions = defaultdict(set)        # URL -> set of completed actions
+        self.url_exhausted = False  # Set by step() when the current URL had nothing left to try
 
+        # Rewards are scored inline unless a RewardPipeline is given
+        self.reward_pipeline = reward_pipeline
+        self._reward_lock = threading.Lock()
+        self._deferred_rewards = defaultdict(float)      # episode index -> rewards resolved in the background
+        # Per-episode totals and step counts, kept so late rewards can still flip an episode to a success
+        self._episode_totals = array("d")
+        self._episode_steps = array("I")
+
+        # Decides where to go once the current page has nothing left to try
+        self.scheduler = scheduler or ExplorationScheduler()
+
+        # Private unless ParallelExplorer hands several workers the same state
+        self.shared = shared_state or SharedExplorationState()
+        self.llm_action_memory = self.shared.llm_action_memory
+        self.completed_actions = self.shared.completed_actions
+
+        # Running aggregates only; nothing here grows with the number of steps taken
         self.metrics = {
-            "total_rewards": [],
+            "episodes": 0,
+            "reward_sum": 0.0,
             "success_count": 0,
-            "steps_to_goal": [],
-            "action_log": [],
+            "steps_to_goal_sum": 0,
+            "actions_executed": 0,
+            "unique_actions": set(),
             "llm_prompts": 0,
             "llm_successes": 0,
+            "settle_time": 0.0,
             "state_visits": defaultdict(int),
             "llm_confusion": {
                 "LLM_Used_Success": 0,
@@ -26,87 +54,161 @@ class DumbAgent:
                 "NoLLM_Fail": 0,
             }
         }
-        self.exploration_tracker = defaultdict(lambda: {
-            "buttons": set(),
-            "inputs": set(),
-            "links": set(),
-            "interacted": set()
-        })
-        self.fully_explored_urls = set()
+        self.exploration_tracker = self.shared.exploration_tracker
+        self.fully_explored_urls = self.shared.fully_explored_urls
+
+        # Optional CheckpointStore; every state change below is mirrored into it as an event
+        self.checkpoint = checkpoint
+        self.profile = None  # Crawl profile of the env being explored, for the load stats in the summary
+        self._seen_stories = set()                       # mirrors env.seen_user_stories for checkpoints
+        self._templates = {}                             # state key -> page fingerprint
 
     def stop(self):
         self.should_stop = True
         broadcast_log("🚑 Stop signal received. Preparing to terminate training...")
 
+    @timed("agent.step")
     def step(self, env, use_llm=False):
         state = env.get_state()
         url = state["url"]
         self.metrics["state_visits"][url] += 1
         broadcast_log(f"🌐 Visiting URL: {url}")
-        broadcast_log(f"🔍 State: buttons={state['buttons']}, inputs={state['inputs']}, links={state['links']}")
+        log_debug("🔍 State: buttons=%s, inputs=%s, links=%s", state["buttons"], state["inputs"], state["links"])
+
+        # Bookkeeping is per page template, so /item?id=1 and /item?id=2 share explored actions
+        key = self._state_key(state)
+        if key != url:
+            broadcast_log(f"🧬 Page matches explored template {key}")
+        if "fingerprint" in state and key not in self._templates:
+            self._templates[key] = state["fingerprint"]
+            self._record("template", state["fingerprint"], key)
+
+        if env.actions_url != url and not self.llm_action_memory.get(key):
+            # Reached by a click, so env.action_lookup is still the previous page's; plan outside the lock
+            env.refresh_actions()
 
-        self._update_known_elements(url, state)
+        with self.shared.lock:
+            self._update_known_elements(key, state)
 
-        # Get or reuse stored LLM actions
-        if url not in self.llm_action_memory or not self.llm_action_memory[url]:
-            actions = env.action_lookup
-            self.llm_action_memory[url] = actions
-            broadcast_log(f"🧠 Stored LLM Actions for {url}: {actions}")
+            # Get or reuse stored LLM actions
+            stream = None
+            if key not in self.llm_action_memory or not self.llm_action_memory[key]:
+                actions = env.action_lookup
+                if isinstance(actions, StreamingPlan) and not actions.done:
+                    stream = actions  # Stored (and recorded) once the rest of it has arrived
+                else:
+                    actions = [sys.intern(a) for a in actions]
+                    self.llm_action_memory[key] = actions
+                    self._record("plan", key, actions)
+                    broadcast_log(f"🧠 Stored LLM Actions for {key}: {actions}")
 
-        unexplored_actions = [
-            a for a in self.llm_action_memory[url]
-            if a not in self.completed_actions[url]
-        ]
+            if stream is None:
+                unexplored_actions = [
+                    a for a in self.llm_action_memory[key]
+                    if a not in self.completed_actions[key] and not self.shared.is_claimed(key, a)
+                ]
 
-        if not unexplored_actions:
-            broadcast_log(f"✅ All LLM actions explored for {url}. Ending test early.")
-            return 0  # Or return a negative reward to indicate no more exploration
+        if stream is not None:
+            # Actions are executed as they stream in; claim_action skips anything already taken
+            broadcast_log(f"📡 Executing LLM actions for {key} as they stream in")
+            unexplored_actions = stream
         else:
-            broadcast_log(f"🚦Next Unexplored Actions: {unexplored_actions}")
+            self.url_exhausted = not unexplored_actions
+            self._record_visit(url, key, len(unexplored_actions))
+            if not unexplored_actions:
+                broadcast_log(f"✅ All LLM actions explored for {url}. Ending test early.")
+                self._record("step", url, [])
+                return 0  # Or return a negative reward to indicate no more exploration
+            else:
+                broadcast_log(f"🚦Next Unexplored Actions: {unexplored_actions}")
 
         episode_reward = 0
         redirected = False
+        executed = []
+        performed_actions = []
+        # Plans are shared per template; run each action against this page's own element
+        targets = {} if stream is not None else dict(zip(unexplored_actions, env.remap_actions(unexplored_actions)))
 
         for i, selected_action in enumerate(unexplored_actions):
+            if not self.shared.claim_action(key, selected_action):
+                continue  # Another worker got to it first
             broadcast_log(f"✅ Executing Action: {selected_action}")
-            previous_url = env.driver.current_url
+            previous_url = env.current_url
 
-            env.perform_action(selected_action)
-            self._track_interaction(url, selected_action)
-            self.metrics["action_log"].append(selected_action)
+            # The plan is bookkept by its own action; metrics, coverage and replay paths by what actually ran
+            if stream is None:
+                performed = targets.get(selected_action) or selected_action
+            else:
+                performed = env.remap_actions([selected_action])[0] or selected_action
+            env.perform_action(performed)
+            self.metrics["settle_time"] += env.last_settle_time
+            broadcast_log(f"⏱️ Page settled in {env.last_settle_time * 1000:.0f} ms")
+            self._count_actions([performed])
+            executed.append(selected_action)
+            performed_actions.append(performed)
 
-            # ✅ Immediately mark as completed
-            self.completed_actions[url].add(selected_action)
-            self.llm_action_memory[url] = [a for a in self.llm_action_memory[url] if a != selected_action]
+            with self.shared.lock:
+                self._track_interaction(key, performed)
+                # ✅ Immediately mark as completed
+                self._complete_action(key, selected_action)
 
             # Check for redirect
-            if env.driver.current_url != previous_url:
-                broadcast_log(f"🔄 URL changed to {env.driver.current_url}, ending step.")
+            if env.current_url != previous_url:
+                self.scheduler.record_transition(url, performed, env.current_url)
+                self._record("transition", url, performed, env.current_url)
+                broadcast_log(f"🔄 URL changed to {env.current_url}, ending step.")
                 redirected = True
                 break
 
-        # ✅ Run LLM reward check only ONCE per episode
-        reward = env.check_reward()
-        broadcast_log(f"🎯 Final Episode Reward: {reward}")
-        episode_reward += reward
-        self.memory.append((state, unexplored_actions, reward))
+        if stream is not None and redirected:
+            # We've left the page: stop generating its plan. No plan is stored, so it is planned afresh next visit
+            stream.cancel()
+            unexplored_actions = executed
+            self.url_exhausted = False
+        elif stream is not None:
+            unexplored_actions = stream.result()
+            with self.shared.lock:
+                # Same shape as if the plan had been stored up front and then completed action by action
+                remaining_plan = [sys.intern(a) for a in unexplored_actions if a not in self.completed_actions[key]]
+                self.llm_action_memory[key] = remaining_plan
+                self._record("plan", key, remaining_plan)
+            self.url_exhausted = not remaining_plan
+            broadcast_log(f"🧠 Stored LLM Actions for {key}: {unexplored_actions}")
 
-        # Track LLM metrics
-        if use_llm:
-            self.metrics["llm_successes"] += int(reward > 0)
-            key = "LLM_Used_Success" if reward > 0 else "LLM_Used_Fail"
+        if self.reward_pipeline is not None:
+            # Score in the background; the reward is attached to this memory entry once it resolves
+            transition = env.capture_transition()
+            index = self.memory.append(state, unexplored_actions)
+            episode = self.metrics["episodes"]
+            self.reward_pipeline.submit(
+                env.score_transition, transition,
+                lambda r: self._resolve_reward(index, episode, r, use_llm),
+                batch_scorer=env.score_transitions,
+            )
         else:
-            key = "NoLLM_Success" if reward > 0 else "NoLLM_Fail"
-        self.metrics["llm_confusion"][key] += 1
+            # ✅ Run LLM reward check only ONCE per episode
+            reward = env.check_reward()
+            broadcast_log(f"🎯 Final Episode Reward: {reward}")
+            episode_reward += reward
+            self.memory.append(state, unexplored_actions, reward)
+            self._record_reward_metrics(reward, use_llm)
 
-        self._check_if_url_fully_explored(url, state)
+        self._record("step", url, performed_actions)
+        with self.shared.lock:
+            self._check_if_url_fully_explored(key, state)
+            remaining = sum(1 for a in self.llm_action_memory[key] if a not in self.completed_actions[key])
+        self._record_visit(url, key, remaining)
+        self._maybe_compact_checkpoint()
         return episode_reward
 
-    def run(self, env, episodes=10, use_llm=False):
+    def run(self, env, episodes=10, use_llm=False, max_steps=50):
         obs, _ = env.reset()
+        self._attach_env(env)
         first_state = env.get_state()
         first_url = first_state["url"]
-        self._update_known_elements(first_url, first_state)
+        self.scheduler.set_start(first_url)
+        self._record("start", first_url)
+        self._update_known_elements(self._state_key(first_state), first_state)
         self.metrics["state_visits"][first_url] += 1
 
         for ep in range(episodes):
@@ -114,21 +216,21 @@ class DumbAgent:
                 broadcast_log("⏹️ Training stopped by user.")
                 break
 
-            all_done = all(
-                self._url_fully_explored(url, self.exploration_tracker[url])
-                for url in self.exploration_tracker
-            )
-            if all_done:
+            if self.exploration_tracker.all_done():
                 broadcast_log("✅ All known URLs and DOM elements have been explored. Ending training.")
                 break
 
             broadcast_log(f"🚀 Starting Episode {ep + 1}")
             total_reward = 0
             steps = 0
+            frontier_empty = False
 
-            for step_num in range(50):
+            for step_num in range(max_steps):
                 if self.should_stop:
                     broadcast_log("⏹️ Training interrupted mid-episode.")
+                    self.finish_pending_rewards()
+                    self.save_checkpoint()
+                    self.memory.close()
                     return
 
                 broadcast_log(f"📌 Step {step_num + 1}")
@@ -136,45 +238,243 @@ class DumbAgent:
                 total_reward += r
                 steps += 1
 
-            self.metrics["total_rewards"].append(total_reward)
-            if total_reward > 0:
-                self.metrics["success_count"] += 1
-                self.metrics["steps_to_goal"].append(steps)
-                broadcast_log("🏆 Goal Achieved!")
+                if self.url_exhausted and not self._jump_to_frontier(env):
+                    broadcast_log("🏁 No unexplored states left in the frontier. Ending episode early.")
+                    frontier_empty = True
+                    break
+
+            self.record_episode(total_reward, steps)
             broadcast_log(f"📊 Total Reward for Episode {ep + 1}: {total_reward}")
+            if frontier_empty:
+                broadcast_log("✅ Nothing productive left to explore. Ending training.")
+                break
+        self.finish_pending_rewards()
+        self.save_checkpoint()
+        self.memory.close()
         self.print_summary()
 
+    def _jump_to_frontier(self, env) -> bool:
+        """Navigates to the most promising unexplored URL; False if none can be reached."""
+        current = env.current_url
+        while True:
+            target = self.scheduler.next_target(exclude=current)
+            if target is None:
+                return False
+            if self.scheduler.navigate(env, target):
+                return True
+            broadcast_log(f"⚠️ Could not reach {target}, trying the next candidate.")
+
+    def record_episode(self, total_reward, steps):
+        self._record("episode", total_reward, steps)
+        with self._reward_lock:
+            self._count_episode(total_reward, steps)
+        if total_reward > 0:
+            broadcast_log("🏆 Goal Achieved!")
+
+    def _count_episode(self, total_reward, steps):
+        self._episode_totals.append(total_reward)
+        self._episode_steps.append(steps)
+        self.metrics["episodes"] += 1
+        self.metrics["reward_sum"] += total_reward
+        if total_reward > 0:
+            self.metrics["success_count"] += 1
+            self.metrics["steps_to_goal_sum"] += steps
+
+    def _count_actions(self, actions):
+        self.metrics["actions_executed"] += len(actions)
+        self.metrics["unique_actions"].update(sys.intern(a) for a in actions)
+
+    def _record_reward_metrics(self, reward, use_llm):
+        self._record("reward", reward, use_llm)
+        self._count_reward(reward, use_llm)
+
+    def _count_reward(self, reward, use_llm):
+        # Track LLM metrics
+        if use_llm:
+            self.metrics["llm_successes"] += int(reward > 0)
+            key = "LLM_Used_Success" if reward > 0 else "LLM_Used_Fail"
+        else:
+            key = "NoLLM_Success" if reward > 0 else "NoLLM_Fail"
+        self.metrics["llm_confusion"][key] += 1
+
+    def _resolve_reward(self, index, episode, reward, use_llm):
+        with self._reward_lock:
+            self.memory.set_reward(index, reward)
+            self._record_reward_metrics(reward, use_llm)
+            self._deferred_rewards[episode] += reward
+        broadcast_log(f"🎯 Resolved Background Reward: {reward}")
+
+    def finish_pending_rewards(self):
+        """Waits for background scoring and folds late rewards into their episodes' totals."""
+        if self.reward_pipeline is None:
+            return
+        self.reward_pipeline.join()
+        with self._reward_lock:
+            totals = self._episode_totals
+            for episode, reward in sorted(self._deferred_rewards.items()):
+                if episode >= len(totals):
+                    continue  # Episode was interrupted before it was recorded
+                before = totals[episode]
+                totals[episode] = before + reward
+                self.metrics["reward_sum"] += reward
+                if before <= 0 < totals[episode]:
+                    self.metrics["success_count"] += 1
+                    self.metrics["steps_to_goal_sum"] += self._episode_steps[episode]
+            self._deferred_rewards.clear()
+
+    @staticmethod
+    def _state_key(state):
+        return state.get("template") or state["url"]
+
     def _track_interaction(self, url, action):
-        if action.startswith("click_button:"):
-            label = action.split("click_button:")[1]
-            self.exploration_tracker[url]["buttons"].add(label)
-            self.exploration_tracker[url]["interacted"].add(f"button:{label}")
-        elif action.startswith("type:"):
-            parts = action.split(":")
-            if len(parts) == 3:
-                self.exploration_tracker[url]["inputs"].add(parts[1])
-                self.exploration_tracker[url]["interacted"].add(f"input:{parts[1]}")
-        elif action.startswith("click_link:"):
-            label = action.split("click_link:")[1]
-            self.exploration_tracker[url]["links"].add(label)
-            self.exploration_tracker[url]["interacted"].add(f"link:{label}")
+        self.exploration_tracker.track_action(url, action)
+        self._record("interact", url, action)
 
     def _update_known_elements(self, url, state):
-        self.exploration_tracker[url]["buttons"].update(state["buttons"])
-        self.exploration_tracker[url]["inputs"].update(state["inputs"])
-        self.exploration_tracker[url]["links"].update(state["links"])
+        for kind, labels in ((BUTTON, state["buttons"]), (INPUT, state["inputs"]), (LINK, state["links"])):
+            added = self.exploration_tracker.add_known(url, kind, labels)
+            if added:
+                self._record("known", url, kind, added)
+
+    def _complete_action(self, key, action):
+        self.completed_actions[key].add(action)
+        self.llm_action_memory[key] = [a for a in self.llm_action_memory[key] if a != action]
+        self._record("complete", key, action)
+
+    def _record_visit(self, url, key, remaining):
+        self.scheduler.record_visit(url, key, remaining)
+        self._record("visit", url, key, remaining)
 
     def _check_if_url_fully_explored(self, url, state):
-        if self._url_fully_explored(url, self.exploration_tracker[url]):
+        if self._url_fully_explored(url):
             if url not in self.fully_explored_urls:
                 self.fully_explored_urls.add(url)
+                self._record("explored", url)
                 broadcast_log(f"✅ URL fully explored: {url}")
 
-    def _url_fully_explored(self, url, tracker):
-        all_buttons = all(f"button:{b}" in tracker["interacted"] for b in tracker["buttons"])
-        all_inputs = all(f"input:{i}" in tracker["interacted"] for i in tracker["inputs"])
-        all_links = all(f"link:{l}" in tracker["interacted"] for l in tracker["links"])
-        return all_buttons and all_inputs and all_links
+    # --- Checkpointing -------------------------------------------------------------------------
+
+    def _record(self, *event):
+        if self.checkpoint is not None:
+            self.checkpoint.append(*event)
+
+    def _on_new_story(self, story):
+        with self._reward_lock:
+            self._seen_stories.add(story)
+        self._record("story", story)
+
+    def _attach_env(self, env):
+        """Pushes restored state into a freshly reset env and starts mirroring its stories."""
+        self.profile = getattr(env, "profile", None)
+        env.seen_user_stories.update(self._seen_stories)
+        for key, fingerprint in self._templates.items():
+            env.state_index.add(fingerprint, key)
+        if self.checkpoint is not None:
+            env.on_new_story = self._on_new_story
+
+    def _maybe_compact_checkpoint(self):
+        if self.checkpoint is not None and self.checkpoint.needs_compaction():
+            self.save_checkpoint()
+
+    def save_checkpoint(self):
+        if self.checkpoint is None:
+            return
+        with self.shared.lock, self._reward_lock:
+            self.checkpoint.compact(self.export_state())
+
+    def export_state(self) -> dict:
+        metrics = dict(self.metrics)
+        metrics["state_visits"] = dict(self.metrics["state_visits"])
+        metrics["unique_actions"] = sorted(self.metrics["unique_actions"])
+        return {
+            "tracker": self.exploration_tracker.to_dict(),
+            "completed_actions": {k: sorted(v) for k, v in self.completed_actions.items()},
+            "llm_action_memory": dict(self.llm_action_memory),
+            "fully_explored_urls": sorted(self.fully_explored_urls),
+            "generated_stories": sorted(self.generated_stories),
+            "seen_user_stories": sorted(self._seen_stories),
+            "templates": self._templates,
+            "scheduler": self.scheduler.to_dict(),
+            "metrics": metrics,
+            "episode_totals": list(self._episode_totals),
+            "episode_steps": list(self._episode_steps),
+        }
+
+    def restore_checkpoint(self) -> bool:
+        """Loads the last snapshot and replays the events logged after it; False if none exist."""
+        if self.checkpoint is None:
+            return False
+        snapshot, events = self.checkpoint.load()
+        if snapshot is None and not events:
+            return False
+        with self.shared.lock, self._reward_lock:
+            if snapshot is not None:
+                self._import_state(snapshot)
+            for event in events:
+                self._apply_event(event)
+        broadcast_log(
+            f"♻️ Resumed crawl from checkpoint: {len(self.completed_actions)} states, "
+            f"{sum(len(a) for a in self.completed_actions.values())} completed actions, "
+            f"{self.metrics['episodes']} episodes"
+        )
+        return True
+
+    def _import_state(self, data):
+        self.exploration_tracker.load(data["tracker"])
+        for key, actions in data["completed_actions"].items():
+            self.completed_actions[key].update(actions)
+        self.llm_action_memory.update(data["llm_action_memory"])
+        self.fully_explored_urls.update(data["fully_explored_urls"])
+        self.generated_stories.update(data["generated_stories"])
+        self._seen_stories.update(data["seen_user_stories"])
+        self._templates.update(data["templates"])
+        self.scheduler.load(data["scheduler"])
+        for key, value in data["metrics"].items():
+            if key in ("state_visits", "unique_actions"):
+                self.metrics[key].update(value)
+            else:
+                self.metrics[key] = value
+        self._episode_totals = array("d", data["episode_totals"])
+        self._episode_steps = array("I", data["episode_steps"])
+
+    def _apply_event(self, event):
+        kind, args = event[0], event[1:]
+        if kind == "known":
+            url, element_kind, labels = args
+            self.exploration_tracker.add_known(url, element_kind, labels)
+        elif kind == "interact":
+            self.exploration_tracker.track_action(*args)
+        elif kind == "complete":
+            key, action = args
+            self.completed_actions[key].add(action)
+            self.llm_action_memory[key] = [a for a in self.llm_action_memory[key] if a != action]
+        elif kind == "plan":
+            key, actions = args
+            self.llm_action_memory[key] = actions
+        elif kind == "explored":
+            self.fully_explored_urls.add(args[0])
+        elif kind == "template":
+            fingerprint, key = args
+            self._templates[key] = fingerprint
+        elif kind == "story":
+            self._seen_stories.add(args[0])
+        elif kind == "start":
+            self.scheduler.set_start(args[0])
+        elif kind == "transition":
+            self.scheduler.record_transition(*args)
+        elif kind == "visit":
+            self.scheduler.record_visit(*args)
+        elif kind == "step":
+            url, actions = args
+            self.metrics["state_visits"][url] += 1
+            self._count_actions(actions)
+        elif kind == "reward":
+            self._count_reward(*args)
+        elif kind == "episode":
+            self._count_episode(*args)
+
+    def _url_fully_explored(self, url):
+        return self.exploration_tracker.is_fully_explored(url)
 
     def _check_user_story(self, state, action):
         url = state["url"]
@@ -188,18 +488,40 @@ class DumbAgent:
             broadcast_log("📘 LLM User Story Classification + Test:")
             broadcast_log(story)
 
+    def merge_metrics(self, other):
+        """Folds another agent's metrics into this one (used to summarise parallel workers)."""
+        for key in ("episodes", "reward_sum", "success_count", "steps_to_goal_sum", "actions_executed",
+                    "llm_prompts", "llm_successes", "settle_time"):
+            self.metrics[key] += other[key]
+        self.metrics["unique_actions"].update(other["unique_actions"])
+        for url, visits in other["state_visits"].items():
+            self.metrics["state_visits"][url] += visits
+        for key, count in other["llm_confusion"].items():
+            self.metrics["llm_confusion"][key] += count
+
     def print_summary(self):
-        print("\n📊 Summary Metrics:")
-        num_episodes = len(self.metrics["total_rewards"])
+        broadcast_log("📊 Summary Metrics:")
+        num_episodes = self.metrics["episodes"]
         if num_episodes == 0:
-            print("⚠️ No episodes were completed.")
+            broadcast_log("⚠️ No episodes were completed.")
             return
 
-        print(f"✅ Success Rate: {self.metrics['success_count']} / {num_episodes}")
-        avg_steps = sum(self.metrics["steps_to_goal"]) / len(self.metrics["steps_to_goal"]) if self.metrics["steps_to_goal"] else "N/A"
-        avg_reward = sum(self.metrics["total_rewards"]) / num_episodes
-        print(f"🏃‍♂️ Avg Steps to Goal: {avg_steps}")
-        print(f"🌟 Avg Total Reward: {avg_reward}")
-        print(f"🧠 LLM Prompted: {self.metrics['llm_prompts']} | LLM Helped: {self.metrics['llm_successes']}")
-        action_set = set(self.metrics["action_log"])
-        print(f"🔁 Action Diversity: {len(action_set)} unique actions")
+        broadcast_log(f"✅ Success Rate: {self.metrics['success_count']} / {num_episodes}")
+        successes = self.metrics["success_count"]
+        avg_steps = self.metrics["steps_to_goal_sum"] / successes if successes else "N/A"
+        avg_reward = self.metrics["reward_sum"] / num_episodes
+        broadcast_log(f"🏃‍♂️ Avg Steps to Goal: {avg_steps}")
+        broadcast_log(f"🌟 Avg Total Reward: {avg_reward}")
+        broadcast_log(f"🧠 LLM Prompted: {self.metrics['llm_prompts']} | LLM Helped: {self.metrics['llm_successes']}")
+        broadcast_log(
+            f"🔁 Action Diversity: {len(self.metrics['unique_actions'])} unique actions "
+            f"out of {self.metrics['actions_executed']} executed"
+        )
+        broadcast_log(f"⏱️ Time Waiting for Page Settle: {self.metrics['settle_time']:.2f}s")
+        cache = getattr(self.llm, "cache", None)
+        if cache is not None:
+            broadcast_log(f"🗄️ LLM Cache: {cache.stats}")
+        if self.profile is not None:
+            broadcast_log(f"📦 Page Loads ({self.profile.name} profile): {self.profile.stats.summary()}")
+        for name, span in spans.summary().items():
+            broadcast_log(f"⏲️ {name}: {span['count']} calls, {span['sum']:.2f}s total, {span['avg'] * 1000:.1f}ms avg")
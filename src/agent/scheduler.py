@@ -0,0 +1,127 @@
+import heapq
+import itertools
+import threading
+
+from config.constants import broadcast_log
+
+
+class ExplorationScheduler:
+    """Priority frontier of URLs that still have unexplored actions.
+
+    Candidates are scored by novelty (fewer visits is better), how much is left to explore on
+    them and their distance (recorded action-path length) from the start URL. The best
+    candidate is reached by loading it directly, or by replaying its recorded action path from
+    the start URL when it can't be loaded directly (POST results, client-side routes).
+    """
+
+    def __init__(self):
+        self.start_url = None
+        self.paths = {}          # url -> [(from_url, action), ...] shortest known path from start_url
+        self.visits = {}         # url -> times the agent stepped on it
+        self.templates = {}      # url -> state key the agent tracks it under
+        self.remaining = {}      # state key -> unexplored actions left
+        self._heap = []
+        self._live = {}          # url -> (sequence, score) of its one current heap entry; others are stale
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def set_start(self, url):
+        with self._lock:
+            self.start_url = url
+            self.paths[url] = []
+            self._push(url)
+
+    def record_transition(self, from_url, action, to_url):
+        """Remembers how to_url was reached so it can be replayed later."""
+        with self._lock:
+            path = self.paths.get(from_url, []) + [(from_url, action)]
+            if to_url not in self.paths or len(path) < len(self.paths[to_url]):
+                self.paths[to_url] = path
+            self._push(to_url)
+
+    def record_visit(self, url, key, remaining):
+        with self._lock:
+            self.visits[url] = self.visits.get(url, 0) + 1
+            self.templates[url] = key
+            self.remaining[key] = remaining
+            self._push(url)
+
+    def _score(self, url):
+        key = self.templates.get(url)
+        remaining = self.remaining.get(key, 1) if key is not None else 1  # Unvisited: assume something to do
+        if remaining <= 0:
+            return 0.0
+        novelty = 1.0 / (1 + self.visits.get(url, 0))
+        distance = len(self.paths.get(url, ()))
+        return novelty * remaining / (1 + distance)
+
+    def _push(self, url):
+        score = self._score(url)
+        if score <= 0:
+            self._live.pop(url, None)
+            return
+        live = self._live.get(url)
+        if live is not None and live[1] == score:
+            return
+        sequence = next(self._counter)
+        self._live[url] = (sequence, score)
+        heapq.heappush(self._heap, (-score, sequence, url))
+        if len(self._heap) > 2 * len(self._live) + 64:
+            # Superseded entries are normally dropped as they surface; don't let them pile up meanwhile
+            self._heap = [entry for entry in self._heap if self._live.get(entry[2], (None,))[0] == entry[1]]
+            heapq.heapify(self._heap)
+
+    def next_target(self, exclude=None):
+        """Pops the best URL that still has work, or None when nothing productive remains."""
+        with self._lock:
+            while self._heap:
+                neg_score, sequence, url = heapq.heappop(self._heap)
+                if self._live.get(url, (None,))[0] != sequence:
+                    continue  # Superseded by a later push for the same URL
+                del self._live[url]
+                score = self._score(url)
+                if score <= 0 or url == exclude:
+                    continue
+                if score < -neg_score:
+                    # Lowered since it was pushed (e.g. another page of its template was explored); re-rank it
+                    self._push(url)
+                    continue
+                return url
+            return None
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "start_url": self.start_url,
+                "paths": {url: [list(step) for step in path] for url, path in self.paths.items()},
+                "visits": dict(self.visits),
+                "templates": dict(self.templates),
+                "remaining": dict(self.remaining),
+            }
+
+    def load(self, data):
+        with self._lock:
+            self.start_url = data.get("start_url") or self.start_url
+            self.paths.update({url: [tuple(step) for step in path] for url, path in data.get("paths", {}).items()})
+            self.visits.update(data.get("visits", {}))
+            self.templates.update(data.get("templates", {}))
+            self.remaining.update(data.get("remaining", {}))
+            for url in self.paths:
+                self._push(url)
+
+    def navigate(self, env, url) -> bool:
+        """Moves env to url, directly if possible, else by replaying the recorded action path."""
+        broadcast_log(f"🧭 Jumping to frontier URL: {url}")
+        env.navigate(url)
+        if env.current_url == url:
+            return True
+
+        path = self.paths.get(url)
+        if not path or self.start_url is None:
+            return False
+        broadcast_log(f"🔁 Replaying {len(path)} recorded action(s) to reach {url}")
+        env.navigate(self.start_url)
+        for _, action in path:
+            env.perform_action(action)
+        env.refresh_actions()
+        return env.current_url == url
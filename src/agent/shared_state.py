@@ -0,0 +1,65 @@
+import threading
+from collections import defaultdict, deque
+
+from agent.exploration_tracker import ExplorationTracker
+
+
+class SharedExplorationState:
+    """Exploration bookkeeping that several DumbAgent workers can share.
+
+    A single agent owns a private instance; ParallelExplorer hands the same instance to every
+    worker so that each URL and each (URL, action) pair is claimed by exactly one of them.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.exploration_tracker = ExplorationTracker()
+        self.completed_actions = defaultdict(set)        # URL -> set of completed actions
+        self.llm_action_memory = defaultdict(list)       # URL -> list of all LLM-suggested actions
+        self.fully_explored_urls = set()
+        self.claimed_actions = defaultdict(set)          # URL -> actions taken by some worker
+
+        self._frontier = deque()
+        self._known_urls = set()
+        self._active_urls = set()
+        self._frontier_changed = threading.Condition(self.lock)
+
+    def is_claimed(self, url, action) -> bool:
+        with self.lock:
+            return action in self.claimed_actions[url]
+
+    def claim_action(self, url, action) -> bool:
+        with self.lock:
+            if action in self.claimed_actions[url] or action in self.completed_actions[url]:
+                return False
+            self.claimed_actions[url].add(action)
+            return True
+
+    def add_url(self, url):
+        with self.lock:
+            if url in self._known_urls:
+                return
+            self._known_urls.add(url)
+            self._frontier.append(url)
+            self._frontier_changed.notify()
+
+    def claim_url(self, timeout=0.5):
+        """Pops the next unclaimed URL, or returns None if none became available within timeout."""
+        with self.lock:
+            if not self._frontier:
+                self._frontier_changed.wait(timeout)
+            if not self._frontier:
+                return None
+            url = self._frontier.popleft()
+            self._active_urls.add(url)
+            return url
+
+    def release_url(self, url):
+        with self.lock:
+            self._active_urls.discard(url)
+            self._frontier_changed.notify_all()
+
+    def is_idle(self) -> bool:
+        """True once nothing is queued and no worker is still exploring (and may discover more)."""
+        with self.lock:
+            return not self._frontier and not self._active_urls
@@ -0,0 +1,112 @@
+import re
+import threading
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+from config.constants import STORY_SIMILARITY_THRESHOLD, STORY_MINHASH_PERM, STORY_SHINGLE_SIZE
+
+MERSENNE_PRIME = (1 << 31) - 1
+WORD_RE = re.compile(r"[a-z0-9_]+")
+DIGITS_RE = re.compile(r"\d+")
+
+
+def shingles(text, size=STORY_SHINGLE_SIZE) -> set:
+    """Hashed word size-grams of text, lower-cased with digits normalised."""
+    words = WORD_RE.findall(DIGITS_RE.sub("0", text.lower()))
+    if len(words) < size:
+        words = words + [""] * (size - len(words))
+    return {zlib.crc32(" ".join(words[i:i + size]).encode("utf-8")) for i in range(len(words) - size + 1)}
+
+
+def lsh_params(threshold, num_perm):
+    """(bands, rows) with the most rows whose LSH S-curve midpoint (1/bands)^(1/rows) is still
+    at or below threshold. Erring low keeps recall high; candidates are verified afterwards."""
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows == 0 and (rows / num_perm) ** (1 / rows) <= threshold:
+            best = (num_perm // rows, rows)
+    return best
+
+
+class StoryIndex:
+    """Set of generated user stories that also recognises near-duplicates.
+
+    Stories are reduced to MinHash signatures over word shingles and bucketed by LSH bands,
+    so a lookup only compares against stories sharing a band instead of every stored story.
+    A story counts as seen when its estimated Jaccard similarity to a stored one reaches
+    threshold. Supports the set operations the env and checkpoints use (in, add, update, clear).
+    """
+
+    def __init__(self, threshold=STORY_SIMILARITY_THRESHOLD, num_perm=STORY_MINHASH_PERM,
+                 shingle_size=STORY_SHINGLE_SIZE, seed=1):
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._stories = {}                  # story -> signature
+        self._buckets = defaultdict(list)   # (band, band hash) -> [signature, ...]
+        self._lock = threading.Lock()
+
+    def signature(self, text) -> np.ndarray:
+        hashes = np.fromiter(shingles(text, self.shingle_size), dtype=np.uint64)
+        # Universal hashes (a*x + b) mod p; a, x < 2^32 so the product fits in uint64
+        values = (self._a[:, None] * (hashes[None, :] % MERSENNE_PRIME) + self._b[:, None]) % MERSENNE_PRIME
+        return values.min(axis=1)
+
+    def _band_keys(self, signature):
+        r = self.rows
+        return [(band, signature[band * r:(band + 1) * r].tobytes()) for band in range(self.bands)]
+
+    def _best_match(self, signature, keys):
+        best = 0.0
+        seen = set()
+        for key in keys:
+            for candidate in self._buckets.get(key, ()):
+                if id(candidate) in seen:
+                    continue
+                seen.add(id(candidate))
+                best = max(best, float(np.mean(candidate == signature)))
+        return best
+
+    def similarity(self, text) -> float:
+        """Highest estimated Jaccard similarity between text and any stored story."""
+        signature = self.signature(text)
+        with self._lock:
+            if text in self._stories:
+                return 1.0
+            return self._best_match(signature, self._band_keys(signature))
+
+    def add(self, text) -> bool:
+        """Stores text and returns True, or returns False if it (nearly) duplicates a stored story."""
+        signature = self.signature(text)
+        keys = self._band_keys(signature)
+        with self._lock:
+            if text in self._stories or self._best_match(signature, keys) >= self.threshold:
+                return False
+            self._stories[text] = signature
+            for key in keys:
+                self._buckets[key].append(signature)
+            return True
+
+    def update(self, stories):
+        for story in stories:
+            self.add(story)
+
+    def clear(self):
+        with self._lock:
+            self._stories.clear()
+            self._buckets.clear()
+
+    def __contains__(self, text):
+        return self.similarity(text) >= self.threshold
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._stories))
+
+    def __len__(self):
+        return len(self._stories)
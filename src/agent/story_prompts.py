@@ -0,0 +1,45 @@
+import re
+
+STORY_INSTRUCTIONS = (
+    "Based on the following action and DOM, classify if this path is novel or repeated. Then return:\n"
+    "1. Classification (novel or repeated)\n"
+    "2. A user story\n"
+    "3. A pytest-style Selenium test\n"
+    "4. A snippet of matching DOM\n\n"
+)
+
+ITEM_RE = re.compile(r"<<<ITEM (\d+)>>>(.*?)<<<END \1>>>", re.DOTALL)
+
+
+def _describe(transition) -> str:
+    return (
+        f"URL: {transition['url']}\n"
+        f"Action: {transition['action']}\n"
+        f"DOM:\n{transition['dom_snippet']}\n"
+    )
+
+
+def story_prompt(transition) -> str:
+    return STORY_INSTRUCTIONS + _describe(transition)
+
+
+def batch_story_prompt(transitions) -> str:
+    """One prompt scoring several transitions; answers come back wrapped in per-item markers."""
+    items = "\n".join(f"### Transition {i}\n{_describe(t)}" for i, t in enumerate(transitions))
+    return (
+        f"{STORY_INSTRUCTIONS}"
+        f"Do this separately for each of the {len(transitions)} transitions below. Wrap the answer for "
+        f"transition N in a line <<<ITEM N>>> and a line <<<END N>>>, with nothing outside those blocks.\n\n"
+        f"{items}"
+    )
+
+
+def parse_batch_response(text, count) -> dict:
+    """{item index: answer} for every well-formed, non-empty block; missing items are left out."""
+    answers = {}
+    for match in ITEM_RE.finditer(text):
+        index = int(match.group(1))
+        answer = match.group(2).strip()
+        if 0 <= index < count and answer and index not in answers:
+            answers[index] = answer
+    return answers
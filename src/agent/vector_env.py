@@ -0,0 +1,89 @@
+import gymnasium as gym
+from gymnasium.vector import AsyncVectorEnv
+from gymnasium.wrappers import TimeLimit
+
+from config.constants import (
+    BEDROCK_MAX_CONCURRENCY,
+    BEDROCK_REQUESTS_PER_SEC,
+    BEDROCK_TOKENS_PER_MIN,
+    VECTOR_ENV_CONTEXT,
+    VECTOR_ENV_MAX_STEPS,
+)
+from agent.browser_gym_env import BrowserGymEnv
+from agent.driver_pool import DriverPool
+from agent.llm_planner import BedrockLLM
+from agent.rate_limiter import RateLimiter
+
+
+class OwnedBrowser(gym.Wrapper):
+    """Quits a sub-environment's private browser on close instead of returning it to a pool nobody else uses."""
+
+    def close(self):
+        try:
+            self.env.close()
+        finally:
+            self.env.unwrapped.driver_pool.close()
+
+
+class BrowserEnvFactory:
+    """Picklable BrowserGymEnv constructor, called inside each worker process.
+
+    The browser, Bedrock client and caches are all created in the worker, so nothing
+    unpicklable crosses the process boundary. A process-wide RateLimiter can't span workers,
+    so each one gets llm_share of the Bedrock request, token and concurrency budget. Episodes
+    are truncated after max_episode_steps because BrowserGymEnv itself only ends one on a new
+    user story or an invalid action.
+    """
+
+    def __init__(self, start_url, use_llm=False, profile=None, max_episode_steps=VECTOR_ENV_MAX_STEPS, llm_share=1.0,
+                 **env_kwargs):
+        self.start_url = start_url
+        self.use_llm = use_llm
+        self.llm_share = llm_share
+        self.profile = profile
+        self.max_episode_steps = max_episode_steps
+        self.env_kwargs = env_kwargs
+
+    def _make_llm(self):
+        rate_limiter = RateLimiter(
+            requests_per_sec=BEDROCK_REQUESTS_PER_SEC * self.llm_share,
+            tokens_per_min=BEDROCK_TOKENS_PER_MIN * self.llm_share,
+            max_concurrency=max(1, int(BEDROCK_MAX_CONCURRENCY * self.llm_share)),
+        )
+        return BedrockLLM(rate_limiter=rate_limiter)
+
+    def __call__(self):
+        env = BrowserGymEnv(
+            use_llm=self.use_llm,
+            llm=self._make_llm() if self.use_llm else None,
+            start_url=self.start_url,
+            driver_pool=DriverPool(size=1, profile=self.profile),
+            **self.env_kwargs,
+        )
+        return TimeLimit(OwnedBrowser(env), max_episode_steps=self.max_episode_steps)
+
+
+def make_vector_env(start_urls, num_envs=None, use_llm=False, profile=None, max_episode_steps=VECTOR_ENV_MAX_STEPS,
+                    context=VECTOR_ENV_CONTEXT, **env_kwargs) -> AsyncVectorEnv:
+    """Runs BrowserGymEnvs in subprocesses behind one batched step/reset with autoreset.
+
+    start_urls is a single URL (every sub-environment starts there; num_envs of them) or one
+    URL per sub-environment. Observations come back through shared-memory NumPy buffers.
+    Each sub-environment owns its own browser, LLM client and template index, and its log
+    lines stay in its worker process. The Bedrock budget (BEDROCK_REQUESTS_PER_SEC,
+    BEDROCK_TOKENS_PER_MIN, BEDROCK_MAX_CONCURRENCY) is split evenly across the workers.
+
+    All workers share the LLM cache's SQLite file. SQLite serialises their writes with a file
+    lock, so with many LLM-backed workers cache writes can queue behind each other; point
+    LLM_CACHE_PATH at a fast local disk, or disable the disk tier with an empty path.
+    """
+    if isinstance(start_urls, str):
+        start_urls = [start_urls] * (num_envs or 1)
+    elif num_envs is not None and num_envs != len(start_urls):
+        raise ValueError(f"Got {len(start_urls)} start URLs for {num_envs} environments")
+    factories = [
+        BrowserEnvFactory(url, use_llm=use_llm, profile=profile, max_episode_steps=max_episode_steps,
+                          llm_share=1.0 / len(start_urls), **env_kwargs)
+        for url in start_urls
+    ]
+    return AsyncVectorEnv(factories, shared_memory=True, context=context)
@@ -0,0 +1,79 @@
+import hashlib
+import re
+import threading
+import time
+
+INPUT_NAME_RE = re.compile(r"<input\b[^>]*\bname=[\"']([^\"']+)[\"']", re.IGNORECASE)
+BUTTON_RE = re.compile(r"<button\b[^>]*>(.*?)</button>", re.IGNORECASE | re.DOTALL)
+LINK_RE = re.compile(r"<a\b[^>]*\bhref=[^>]*>(.*?)</a>", re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(r"<[^>]+>")
+WHITESPACE_RE = re.compile(r"\s+")
+BATCH_ITEM_RE = re.compile(r"^### Transition (\d+)\n(.*?)(?=^### Transition |\Z)", re.MULTILINE | re.DOTALL)
+
+
+def _text(fragment):
+    return WHITESPACE_RE.sub(" ", TAG_RE.sub("", fragment)).strip()
+
+
+class FakeLLM:
+    """Deterministic stand-in for BedrockLLM with a configurable per-call latency.
+
+    Planning prompts (those sent with a DOM) are answered with every input, button and link on
+    the page in document order; reward prompts get a user story derived from a hash of the
+    prompt, so the same transition always yields the same story. Batched reward prompts get
+    one story per transition in the delimited format the env parses.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.cache = None
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.plan_calls = 0
+        self.story_calls = 0
+
+    def query(self, prompt: str, dom: str = "", css: str = "", js: str = "", use_cache: bool = True,
+              max_tokens: int = 300) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+            if dom:
+                self.plan_calls += 1
+            else:
+                self.story_calls += 1
+        if dom:
+            return self._plan(dom)
+        items = BATCH_ITEM_RE.findall(prompt)
+        if items:
+            return "\n".join(f"<<<ITEM {i}>>>\n{self._story(body)}\n<<<END {i}>>>" for i, body in items)
+        return self._story(prompt)
+
+    @staticmethod
+    def _story(prompt):
+        digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:12]
+        return f"novel\nAs a user I can follow path {digest}.\ndef test_{digest}(): pass"
+
+    def query_stream(self, prompt: str, dom: str = "", css: str = "", js: str = "", max_actions=None,
+                     use_cache: bool = True):
+        """Streams the same plan as query(), spreading the latency evenly over its lines."""
+        with self._lock:
+            self.calls += 1
+            self.plan_calls += 1
+        lines = self._plan(dom).split("\n") if dom else []
+        for i, line in enumerate(lines[:max_actions] if max_actions else lines):
+            if self.latency:
+                time.sleep(self.latency / max(len(lines), 1))
+            if line:
+                yield line.lower()
+
+    @staticmethod
+    def _plan(dom):
+        actions = [f"type:{name}:test123" for name in INPUT_NAME_RE.findall(dom)]
+        actions += [f"click_button:{text}" for text in map(_text, BUTTON_RE.findall(dom)) if text]
+        actions += [f"click_link:{text}" for text in map(_text, LINK_RE.findall(dom)) if text]
+        return "\n".join(actions)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"calls": self.calls, "plan_calls": self.plan_calls, "story_calls": self.story_calls}
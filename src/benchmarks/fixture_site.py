@@ -0,0 +1,127 @@
+import os
+import threading
+
+from flask import Blueprint, Flask, abort, request
+from werkzeug.serving import make_server
+
+from routes.routes import dashboard
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="UTF-8"><title>{title}</title></head>
+<body>
+    <nav><a href="/shop/">home</a> <a href="/shop/cart">cart</a></nav>
+    <h1>{title}</h1>
+    {body}
+</body>
+</html>"""
+
+
+class FixtureCatalog:
+    """A generated shop: categories of paginated item listings plus one detail page per item.
+
+    Every listing page and every item page is built from the same template, so a crawler that
+    recognises templated URLs should plan them once rather than once per page.
+    """
+
+    def __init__(self, num_items=2000, num_categories=20, page_size=25):
+        self.num_items = num_items
+        self.num_categories = num_categories
+        self.page_size = page_size
+
+    def items_in(self, category):
+        return range(category, self.num_items, self.num_categories)
+
+    def home(self):
+        links = "".join(f'<li><a href="/shop/category/{c}">category {c}</a></li>' for c in range(self.num_categories))
+        return PAGE.format(title="shop", body=f"<ul>{links}</ul>")
+
+    def category(self, category, page):
+        items = self.items_in(category)
+        pages = max((len(items) + self.page_size - 1) // self.page_size, 1)
+        if not 0 <= category < self.num_categories or not 1 <= page <= pages:
+            abort(404)
+        start = (page - 1) * self.page_size
+        rows = "".join(f'<li><a href="/shop/item/{i}">item {i}</a></li>' for i in items[start:start + self.page_size])
+        nav = ""
+        if page > 1:
+            nav += f'<a href="/shop/category/{category}?page={page - 1}">previous</a> '
+        if page < pages:
+            nav += f'<a href="/shop/category/{category}?page={page + 1}">next</a>'
+        body = (
+            f'<form onsubmit="return false"><input type="text" name="filter"><button>filter</button></form>'
+            f"<ul>{rows}</ul><p>{nav}</p>"
+        )
+        return PAGE.format(title=f"category {category} page {page}", body=body)
+
+    def item(self, item):
+        if not 0 <= item < self.num_items:
+            abort(404)
+        category = item % self.num_categories
+        related = "".join(
+            f'<li><a href="/shop/item/{(item + k) % self.num_items}">item {(item + k) % self.num_items}</a></li>'
+            for k in (1, 2, 3)
+        )
+        body = (
+            f"<p>price: ${item % 97 + 1}.99</p>"
+            f'<input type="number" name="quantity" value="1">'
+            f'<button onclick="document.getElementById(\'status\').textContent = \'added\'">add to cart</button>'
+            f'<p id="status"></p>'
+            f'<a href="/shop/category/{category}">back to category</a>'
+            f"<ul>{related}</ul>"
+        )
+        return PAGE.format(title=f"item {item}", body=body)
+
+    def cart(self):
+        body = (
+            '<input type="text" name="coupon"><button onclick="alert(\'coupon applied\')">apply coupon</button>'
+            '<a href="/shop/checkout">checkout</a>'
+        )
+        return PAGE.format(title="cart", body=body)
+
+    def checkout(self):
+        body = (
+            '<form onsubmit="document.body.innerHTML = \'<p>order placed</p>\'; return false">'
+            '<input type="text" name="name"><input type="text" name="address"><button>place order</button></form>'
+        )
+        return PAGE.format(title="checkout", body=body)
+
+
+def create_fixture_app(num_items=2000, num_categories=20, page_size=25) -> Flask:
+    """Serves the dashboard blueprint (so /v1/banking is the real route) plus a generated shop under /shop."""
+    app = Flask(
+        __name__,
+        template_folder=os.path.join(SRC_DIR, "templates"),
+        static_folder=os.path.join(SRC_DIR, "static"),
+    )
+    app.register_blueprint(dashboard, url_prefix="/v1")
+
+    catalog = FixtureCatalog(num_items, num_categories, page_size)
+    shop = Blueprint("shop", __name__)
+    shop.add_url_rule("/", "home", catalog.home)
+    shop.add_url_rule("/category/<int:category>", "category",
+                      lambda category: catalog.category(category, request.args.get("page", 1, type=int)))
+    shop.add_url_rule("/item/<int:item>", "item", catalog.item)
+    shop.add_url_rule("/cart", "cart", catalog.cart)
+    shop.add_url_rule("/checkout", "checkout", catalog.checkout)
+    app.register_blueprint(shop, url_prefix="/shop")
+    return app
+
+
+class FixtureServer:
+    """Runs a fixture app on a background thread; port 0 picks a free port."""
+
+    def __init__(self, app, host="127.0.0.1", port=0):
+        self._server = make_server(host, port, app, threaded=True)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self.base_url = f"http://{host}:{self._server.server_port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._thread.join()
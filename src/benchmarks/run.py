@@ -0,0 +1,181 @@
+"""Offline crawl benchmark: python -m benchmarks.run [--site shop|banking] [--output results.json]
+
+Serves a local fixture site, crawls it with a FakeLLM in place of Bedrock and prints (or writes)
+a JSON report that can be diffed between commits.
+"""
+import argparse
+import contextlib
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from agent.browser_gym_env import BrowserGymEnv
+from agent.http_fetcher import HttpFetcher
+from agent.rl_agent import DumbAgent
+from config.metrics import spans, cprofile_to
+from benchmarks.fake_llm import FakeLLM
+from benchmarks.fixture_site import FixtureServer, create_fixture_app
+
+SITES = {"shop": "/shop/", "banking": "/v1/banking"}
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of values (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered))) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+class RoundTripCounter:
+    """Counts WebDriver commands by wrapping the driver's command executor until uninstalled."""
+
+    def __init__(self, driver):
+        self.executor = driver.command_executor
+        self.original = self.executor.execute
+        self.count = 0
+
+        def execute(command, params):
+            self.count += 1
+            return self.original(command, params)
+
+        self.executor.execute = execute
+
+    def uninstall(self):
+        # The driver goes back to the pool afterwards, so drop the instance-level override
+        del self.executor.execute
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_benchmark(site="shop", episodes=5, max_steps=50, use_llm=True, llm_latency=0.0, profile=None,
+                  num_items=2000, trace_memory=False, cprofile=None, stream=False,
+                  http_fast_path=False) -> dict:
+    spans.reset()
+    if trace_memory:
+        tracemalloc.start()
+
+    llm = FakeLLM(latency=llm_latency)
+    step_times = []
+    app = create_fixture_app(num_items=num_items)
+    with FixtureServer(app) as server:
+        env = BrowserGymEnv(use_llm=use_llm, llm=llm, start_url=server.base_url + SITES[site], profile=profile,
+                            stream_llm=stream, http_fast_path=http_fast_path,
+                            fetcher=HttpFetcher() if http_fast_path else None)
+        # On the fast path Chrome may never be checked out, so WebDriver commands aren't counted
+        counter = None if http_fast_path else RoundTripCounter(env.driver)
+        agent = DumbAgent(llm_ins=llm)
+        step = agent.step
+
+        def timed_step(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return step(*args, **kwargs)
+            finally:
+                step_times.append(time.perf_counter() - started)
+
+        agent.step = timed_step
+        started = time.perf_counter()
+        try:
+            profiling = cprofile_to(cprofile) if cprofile else contextlib.nullcontext()
+            with profiling:
+                agent.run(env, episodes=episodes, use_llm=use_llm, max_steps=max_steps)
+        finally:
+            elapsed = time.perf_counter() - started
+            if counter is not None:
+                counter.uninstall()
+            env.close()
+
+    steps = len(step_times)
+    rss_unit = 1024 * 1024 if sys.platform == "darwin" else 1024  # ru_maxrss is bytes on macOS, KiB on Linux
+    states = len(agent.llm_action_memory)
+    results = {
+        "steps": steps,
+        "elapsed": elapsed,
+        "steps_per_sec": steps / elapsed if elapsed else 0.0,
+        "round_trips": counter.count if counter else None,
+        "round_trips_per_step": counter.count / steps if counter and steps else None,
+        "http_pages": env.fetcher.stats if env.fetcher else None,
+        "states": states,
+        "llm": llm.stats(),
+        "llm_calls_per_new_state": llm.plan_calls / states if states else 0.0,
+        "step_latency_p50": percentile(step_times, 50),
+        "step_latency_p95": percentile(step_times, 95),
+        "settle_time": agent.metrics["settle_time"],
+        "page_loads": env.profile.stats.summary(),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / rss_unit,
+        "spans": spans.summary(),
+    }
+    if trace_memory:
+        results["peak_python_heap_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+
+    return {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "config": {
+            "site": site,
+            "episodes": episodes,
+            "max_steps": max_steps,
+            "use_llm": use_llm,
+            "llm_latency": llm_latency,
+            "profile": env.profile.name,
+            "num_items": num_items,
+            "stream": stream,
+            "http_fast_path": http_fast_path,
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the crawler against a local fixture site.")
+    parser.add_argument("--site", choices=sorted(SITES), default="shop")
+    parser.add_argument("--episodes", type=int, default=5)
+    parser.add_argument("--max-steps", type=int, default=50)
+    parser.add_argument("--no-llm", action="store_true", help="crawl without the (fake) LLM planner")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="seconds each fake LLM call takes")
+    parser.add_argument("--stream", action="store_true", help="stream plans and act on them as they arrive")
+    parser.add_argument("--http-fast-path", action="store_true",
+                        help="fetch server-rendered pages over HTTP and only use Chrome when needed")
+    parser.add_argument("--profile", default=None, help="crawl profile (fast or faithful)")
+    parser.add_argument("--items", type=int, default=2000, help="item pages in the generated shop")
+    parser.add_argument("--trace-memory", action="store_true", help="also report peak Python heap (slower)")
+    parser.add_argument("--cprofile", metavar="PATH", help="write a cProfile dump of the crawl to PATH")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        site=args.site,
+        episodes=args.episodes,
+        max_steps=args.max_steps,
+        use_llm=not args.no_llm,
+        llm_latency=args.llm_latency,
+        profile=args.profile,
+        num_items=args.items,
+        trace_memory=args.trace_memory,
+        cprofile=args.cprofile,
+        stream=args.stream,
+        http_fast_path=args.http_fast_path,
+    )
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,95 @@
 import os
 import boto3
-from datetime import datetime
+
+from config.log_bus import LogBus, LEVEL_NAMES, DEBUG, INFO
 
 MAX_OBS_TOKENS = 5000
 START_URL = ""
 
-log_subscribers = []
+# Page settle detection (see agent/page_settle.py)
+SETTLE_STRATEGY = os.getenv("SETTLE_STRATEGY", "event")  # event or fixed
+SETTLE_QUIET_MS = int(os.getenv("SETTLE_QUIET_MS", "100"))
+SETTLE_TIMEOUT = float(os.getenv("SETTLE_TIMEOUT", "5"))
+SETTLE_POLL_MS = 25
+
+# LLM response cache (see agent/llm_cache.py)
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite3"))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "1024"))
+LLM_CACHE_DISK_ENTRIES = int(os.getenv("LLM_CACHE_DISK_ENTRIES", "50000"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+
+# Token budget for the distilled DOM/CSS/JS context sent with planning prompts (see agent/dom_distiller.py)
+LLM_CONTEXT_TOKEN_BUDGET = int(os.getenv("LLM_CONTEXT_TOKEN_BUDGET", "1500"))
+
+# Stream action plans from Bedrock and start executing them before the completion finishes
+LLM_STREAMING = os.getenv("LLM_STREAMING", "false").lower() == "true"
+
+# Near-duplicate user-story detection (see agent/story_index.py)
+STORY_SIMILARITY_THRESHOLD = float(os.getenv("STORY_SIMILARITY_THRESHOLD", "0.6"))  # estimated Jaccard
+STORY_MINHASH_PERM = int(os.getenv("STORY_MINHASH_PERM", "128"))
+STORY_SHINGLE_SIZE = 3  # words per shingle
+
+# Background reward scoring: transitions scored per LLM call, and how long to wait to fill a batch
+REWARD_BATCH_SIZE = int(os.getenv("REWARD_BATCH_SIZE", "1"))  # 1 = one call per transition
+REWARD_BATCH_MAX_WAIT = float(os.getenv("REWARD_BATCH_MAX_WAIT", "2.0"))  # seconds
+
+# Crawl checkpoints (see agent/checkpoint.py)
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", os.path.join(".cache", "checkpoints"))
+CHECKPOINT_COMPACT_EVERY = int(os.getenv("CHECKPOINT_COMPACT_EVERY", "2000"))  # log records between snapshots
+
+# Agent step history (see agent/history.py): steps kept in memory before older ones spill to disk
+HISTORY_RETENTION = int(os.getenv("HISTORY_RETENTION", "1000"))
+HISTORY_SPILL_DIR = os.getenv("HISTORY_SPILL_DIR", os.path.join(".cache", "history"))
+
+# cProfile dumps of training runs started with cprofile=true (see config/metrics.py)
+CPROFILE_DIR = os.getenv("CPROFILE_DIR", os.path.join(".cache", "profiles"))
+
+# Warm browser pool (see agent/driver_pool.py)
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", "8"))  # max live Chrome instances
+DRIVER_MAX_USES = int(os.getenv("DRIVER_MAX_USES", "50"))   # checkouts before a driver is relaunched
+
+# Crawl profiles (see agent/crawl_profile.py): "fast" blocks heavy resources, "faithful" loads everything
+CRAWL_PROFILE = os.getenv("CRAWL_PROFILE", "faithful")
+FAST_PAGE_LOAD_TIMEOUT = float(os.getenv("FAST_PAGE_LOAD_TIMEOUT", "10"))  # seconds
+FAITHFUL_PAGE_LOAD_TIMEOUT = float(os.getenv("FAITHFUL_PAGE_LOAD_TIMEOUT", "60"))
+
+# HTTP fast path (see agent/http_fetcher.py): fetch and parse server-rendered pages without Chrome
+HTTP_FAST_PATH = os.getenv("HTTP_FAST_PATH", "false").lower() == "true"
+HTTP_FETCH_TIMEOUT = float(os.getenv("HTTP_FETCH_TIMEOUT", "10"))  # seconds
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "16"))      # kept-alive connections per host
+STATIC_MIN_TEXT_CHARS = int(os.getenv("STATIC_MIN_TEXT_CHARS", "200"))  # less text plus scripts = client-rendered
+# Comma-separated regexes; matching URLs always go to the browser
+BROWSER_ONLY_URL_PATTERNS = [p.strip() for p in os.getenv("BROWSER_ONLY_URL_PATTERNS", "").split(",") if p.strip()]
+
+# Bedrock rate limiting (see agent/rate_limiter.py)
+BEDROCK_REQUESTS_PER_SEC = float(os.getenv("BEDROCK_REQUESTS_PER_SEC", "1"))
+BEDROCK_TOKENS_PER_MIN = float(os.getenv("BEDROCK_TOKENS_PER_MIN", "100000"))
+BEDROCK_MAX_RETRIES = int(os.getenv("BEDROCK_MAX_RETRIES", "6"))
+BEDROCK_BACKOFF_BASE = 1.0  # seconds
+BEDROCK_BACKOFF_MAX = 30.0
+BEDROCK_MAX_CONCURRENCY = int(os.getenv("BEDROCK_MAX_CONCURRENCY", "4"))  # in-flight calls across all jobs
+
+# Vectorised envs (see agent/vector_env.py)
+VECTOR_ENV_MAX_STEPS = int(os.getenv("VECTOR_ENV_MAX_STEPS", "50"))  # steps before an episode is truncated
+VECTOR_ENV_CONTEXT = os.getenv("VECTOR_ENV_CONTEXT", "spawn")        # multiprocessing start method
+
+# Training jobs (see agent/job_manager.py)
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", "2"))
+MAX_BROWSERS = int(os.getenv("MAX_BROWSERS", "8"))  # browsers all running jobs may hold at once
+MAX_FINISHED_JOBS = int(os.getenv("MAX_FINISHED_JOBS", "50"))  # finished jobs kept for status queries
+
+# Logging: every subscriber (dashboard stream, /logs poller) gets a bounded ring buffer
+LOG_BUFFER_SIZE = int(os.getenv("LOG_BUFFER_SIZE", "1000"))
+LOG_LEVEL = LEVEL_NAMES.get(os.getenv("LOG_LEVEL", "info").lower(), INFO)
+
+log_bus = LogBus(buffer_size=LOG_BUFFER_SIZE, level=LOG_LEVEL)
+
+def broadcast_log(message: str, *args, level=INFO):
+    log_bus.publish(message, *args, level=level)
 
-def broadcast_log(message: str):
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    formatted = f"[{timestamp}] {message.strip()}\n"
-    for q in log_subscribers:
-        q.put(formatted)
+def log_debug(message: str, *args):
+    """Debug-level log; %-style args are only formatted when debug logging is enabled."""
+    log_bus.publish(message, *args, level=DEBUG)
 
 # Determine environment profile
 ENV = os.getenv("APP_ENV", "local")  # local or dev
@@ -0,0 +1,110 @@
+import contextlib
+import contextvars
+import threading
+from collections import deque
+from datetime import datetime
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR}
+
+# Training job the current thread is working for; threads a job starts must copy the context
+current_job = contextvars.ContextVar("current_job", default=None)
+
+
+@contextlib.contextmanager
+def bind_job(job_id):
+    token = current_job.set(job_id)
+    try:
+        yield
+    finally:
+        current_job.reset(token)
+
+
+class LogSubscriber:
+    """Fixed-size ring buffer of formatted log lines; the oldest lines are dropped when full.
+
+    A subscriber with a job_id only receives lines logged on behalf of that training job.
+    """
+
+    def __init__(self, maxlen, job_id=None):
+        self.job_id = job_id
+        self._buffer = deque(maxlen=maxlen)
+        self._ready = threading.Condition()
+        self.dropped = 0
+
+    def put(self, line):
+        with self._ready:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(line)
+            self._ready.notify_all()
+
+    def drain(self) -> list:
+        with self._ready:
+            lines = list(self._buffer)
+            self._buffer.clear()
+            return lines
+
+    def wait(self, timeout=None) -> list:
+        """Blocks until at least one line is buffered (or timeout), then drains."""
+        with self._ready:
+            if not self._buffer:
+                self._ready.wait(timeout)
+            lines = list(self._buffer)
+            self._buffer.clear()
+            return lines
+
+    def clear(self):
+        with self._ready:
+            self._buffer.clear()
+
+
+class LogBus:
+    """Fans log lines out to bounded subscriber buffers.
+
+    Messages below the bus level are discarded before any formatting happens, so callers can
+    pass %-style arguments (e.g. a whole state dict) to debug logs for free when disabled.
+    """
+
+    def __init__(self, buffer_size=1000, level=INFO):
+        self.buffer_size = buffer_size
+        self.level = level
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def is_enabled(self, level) -> bool:
+        return level >= self.level
+
+    def subscribe(self, job_id=None) -> LogSubscriber:
+        subscriber = LogSubscriber(self.buffer_size, job_id)
+        with self._lock:
+            self._subscribers = self._subscribers + [subscriber]
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s is not subscriber]
+
+    @property
+    def subscribers(self) -> list:
+        return self._subscribers
+
+    def publish(self, message, *args, level=INFO):
+        if level < self.level:
+            return
+        subscribers = self._subscribers  # Copy-on-write, so no lock needed to iterate
+        if not subscribers:
+            return
+        if args:
+            message = message % args
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        job = current_job.get()
+        tag = f"[job {job}] " if job is not None else ""
+        formatted = f"[{timestamp}] {tag}{message.strip()}\n"
+        for subscriber in subscribers:
+            if subscriber.job_id is None or subscriber.job_id == job:
+                subscriber.put(formatted)
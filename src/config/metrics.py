@@ -0,0 +1,131 @@
+import bisect
+import contextlib
+import cProfile
+import functools
+import os
+import threading
+import time
+
+# Upper bounds (seconds) of the span histogram buckets; +Inf is implicit
+SPAN_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    def __init__(self, buckets=SPAN_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def clear(self):
+        with self._lock:
+            self.counts = [0] * (len(self.buckets) + 1)
+            self.sum = 0.0
+            self.count = 0
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.counts), self.sum, self.count
+
+
+class SpanRegistry:
+    """Per-span latency histograms for the crawler's hot paths, rendered in Prometheus text format."""
+
+    def __init__(self, buckets=SPAN_BUCKETS):
+        self.buckets = buckets
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name) -> Histogram:
+        hist = self._histograms.get(name)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(name, Histogram(self.buckets))
+        return hist
+
+    def observe(self, name, seconds):
+        self.histogram(name).observe(seconds)
+
+    def _items(self):
+        # Spans register lazily from worker threads, so never iterate the live dict
+        with self._lock:
+            return sorted(self._histograms.items())
+
+    @contextlib.contextmanager
+    def span(self, name):
+        hist = self.histogram(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            hist.observe(time.perf_counter() - started)
+
+    def timed(self, name):
+        """Decorator recording every call of the wrapped function under span name."""
+        def decorator(fn):
+            hist = self.histogram(name)
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    hist.observe(time.perf_counter() - started)
+            return wrapper
+        return decorator
+
+    def summary(self) -> dict:
+        """{span: {"count", "sum", "avg"}} for logs and run summaries."""
+        out = {}
+        for name, hist in self._items():
+            _, total, count = hist.snapshot()
+            out[name] = {"count": count, "sum": total, "avg": total / count if count else 0.0}
+        return out
+
+    def render_prometheus(self, metric="usersim_span_seconds") -> str:
+        lines = [
+            f"# HELP {metric} Time spent in instrumented crawler code paths.",
+            f"# TYPE {metric} histogram",
+        ]
+        for name, hist in self._items():
+            counts, total, count = hist.snapshot()
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f'{metric}_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{span="{name}",le="+Inf"}} {count}')
+            lines.append(f'{metric}_sum{{span="{name}"}} {total}')
+            lines.append(f'{metric}_count{{span="{name}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        # Zero in place: @timed wrappers hold on to their histogram objects
+        with self._lock:
+            for hist in self._histograms.values():
+                hist.clear()
+
+
+spans = SpanRegistry()
+timed = spans.timed
+
+
+@contextlib.contextmanager
+def cprofile_to(path):
+    """Profiles the calling thread into path (pstats format; load with snakeviz/flameprof/pyinstrument)."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        profiler.dump_stats(path)
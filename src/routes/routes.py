@@ -1,18 +1,13 @@
-import queue
-from flask import Blueprint, render_template, request, jsonify
-from io import StringIO
-import sys
+from flask import Blueprint, Response, render_template, request, jsonify, stream_with_context
 
-import threading
-from agent.rl_agent import DumbAgent
-from agent.browser_gym_env import BrowserGymEnv
-from agent.llm_planner import BedrockLLM
-from config.constants import log_subscribers
+from agent.job_manager import JobManager
+from config.constants import CRAWL_PROFILE, log_bus
+from config.metrics import spans
 
 dashboard = Blueprint("dashboard", __name__)
 
-# Track running agent globally
-running_agent = None
+# Every crawl submitted from the dashboard runs as a job with its own id, status and log channel
+job_manager = JobManager()
 
 @dashboard.route("/", methods=["GET"])
 def index():
@@ -20,57 +15,96 @@ def index():
 
 @dashboard.route("/run-training", methods=["POST"])
 def run_training():
-    global running_agent
     try:
-        episodes = int(request.form.get("episodes", 10))
-        use_llm = request.form.get("use_llm", "true").lower() == "true"
-        start_url = request.form.get("start_url", "https://example.com").strip()
-        max_obs_tokens = int(request.form.get("max_obs_tokens", 5000))
+        job = job_manager.submit(
+            request.form.get("start_url", "https://example.com").strip(),
+            episodes=int(request.form.get("episodes", 10)),
+            use_llm=request.form.get("use_llm", "true").lower() == "true",
+            max_obs_tokens=int(request.form.get("max_obs_tokens", 5000)),
+            workers=int(request.form.get("workers", 1)),
+            async_rewards=request.form.get("async_rewards", "false").lower() == "true",
+            resume=request.form.get("resume", "false").lower() == "true",
+            profile=request.form.get("profile", CRAWL_PROFILE).lower(),
+            cprofile=request.form.get("cprofile", "false").lower() == "true",
+        )
+        return render_template("training_dashboard.html", output=f"🚀 Training job {job.id} queued...", success=True)
 
-        llm = BedrockLLM() if use_llm else None
-        env = BrowserGymEnv(use_llm=use_llm, llm=llm, start_url=start_url, max_obs_tokens=max_obs_tokens)
-        agent = DumbAgent(llm_ins=llm)
-        running_agent = agent
+    except Exception as e:
+        return render_template("training_dashboard.html", error=str(e))
 
-        def background_training():
-            output_capture = StringIO()
-            sys.stdout = output_capture
-            try:
-                agent.run(env, episodes=episodes, use_llm=use_llm)
-            finally:
-                sys.stdout = sys.__stdout__
-                log_subscribers[0].put("✅ Training complete.")
 
-        threading.Thread(target=background_training).start()
+@dashboard.route("/jobs")
+def list_jobs():
+    return jsonify({"jobs": [job.to_dict() for job in job_manager.jobs()]})
 
-        return render_template("training_dashboard.html", output="🚀 Training started in background...", success=True)
+@dashboard.route("/jobs/<job_id>")
+def job_status(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    return jsonify(job.to_dict())
 
-    except Exception as e:
-        sys.stdout = sys.__stdout__
-        return render_template("training_dashboard.html", error=str(e))
+@dashboard.route("/jobs/<job_id>/stop", methods=["POST"])
+def stop_job(job_id):
+    if job_manager.get(job_id) is None:
+        return jsonify({"error": "unknown job"}), 404
+    return jsonify({"status": "stopping" if job_manager.stop(job_id) else "not_running"})
 
+@dashboard.route("/jobs/<job_id>/logs")
+def job_logs(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    return jsonify({"logs": job.log.drain(), "dropped": job.log.dropped})
 
-@dashboard.route("/logs")
-def get_logs():
-    if "log_queue" not in globals():
-        global log_queue
-        log_queue = queue.Queue()
-        log_subscribers.append(log_queue)
 
-    logs = []
-    try:
-        while True:
-            logs.append(log_queue.get_nowait())
-    except queue.Empty:
-        pass
+@dashboard.route("/metrics")
+def metrics():
+    """Span latency histograms in Prometheus text exposition format."""
+    return Response(spans.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+# Subscriber backing the legacy /logs polling endpoint, created on first poll
+poll_subscriber = None
 
-    return jsonify({"logs": logs})
+@dashboard.route("/logs")
+def get_logs():
+    global poll_subscriber
+    if poll_subscriber is None:
+        poll_subscriber = log_bus.subscribe()
+    return jsonify({"logs": poll_subscriber.drain(), "dropped": poll_subscriber.dropped})
+
+@dashboard.route("/logs/stream")
+def stream_logs():
+    # ?job=<id> narrows the stream to a single job's logs
+    subscriber = log_bus.subscribe(job_id=request.args.get("job"))
+
+    def events():
+        reported_dropped = 0
+        try:
+            while True:
+                lines = subscriber.wait(timeout=15)
+                if not lines:
+                    yield ": keep-alive\n\n"
+                    continue
+                for line in lines:
+                    yield f"data: {line.rstrip()}\n\n"
+                if subscriber.dropped != reported_dropped:
+                    reported_dropped = subscriber.dropped
+                    yield f"event: dropped\ndata: {reported_dropped}\n\n"
+        finally:
+            log_bus.unsubscribe(subscriber)
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @dashboard.route("/stop-training", methods=["POST"])
 def stop_training():
-    global running_agent
-    if running_agent:
-        running_agent.stop()  # ✅ Now this will work
+    """Stops every queued and running job (use /jobs/<id>/stop for a single one)."""
+    if job_manager.stop_all():
         return jsonify({"status": "stopping"})
     return jsonify({"status": "no_agent_running"})
 
@@ -78,9 +112,8 @@ def stop_training():
 def banking_test_page():
     return render_template("banking_test.html")
 
-@dashboard.route("/v1/wipe-logs", methods=["POST"])
+@dashboard.route("/wipe-logs", methods=["POST"])
 def wipe_logs():
-    from config.constants import log_subscribers
-    for sub in log_subscribers:
+    for sub in log_bus.subscribers:
         sub.clear()
     return jsonify(success=True)
@@ -0,0 +1,133 @@
+import unittest
+
+from agent.http_fetcher import HttpFetcher, StaticPage, cookie_header
+from benchmarks.fixture_site import FixtureCatalog, FixtureServer, create_fixture_app
+
+BASE = "http://shop.test"
+
+
+def static_page(html, url=BASE + "/", status=200, content_type="text/html; charset=utf-8"):
+    return StaticPage(url, status, content_type, html, 1.0, len(html))
+
+
+class FixturePageParsingTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = FixtureCatalog(num_items=50, num_categories=5, page_size=5)
+
+    def test_home_links(self):
+        page = static_page(self.catalog.home(), url=BASE + "/shop/")
+
+        self.assertEqual(page.snapshot["buttons"], [])
+        self.assertEqual(page.snapshot["inputs"], [])
+        self.assertEqual(page.parser.links[:3], [
+            ["home", BASE + "/shop/", True],
+            ["cart", BASE + "/shop/cart", True],
+            ["category 0", BASE + "/shop/category/0", True],
+        ])
+        self.assertEqual(len(page.snapshot["links"]), 2 + 5)
+        self.assertIsNone(page.requires_browser)
+
+    def test_category_form_and_pagination(self):
+        page = static_page(self.catalog.category(1, 1), url=BASE + "/shop/category/1")
+
+        self.assertEqual(page.snapshot["inputs"], ["filter"])
+        self.assertEqual(page.snapshot["buttons"], ["filter"])
+        labels = [text for text, _ in page.snapshot["links"]]
+        self.assertEqual(labels, ["home", "cart", "item 1", "item 6", "item 11", "item 16", "item 21", "next"])
+        self.assertEqual(page.link_target("next"), BASE + "/shop/category/1?page=2")
+        self.assertIsNone(page.requires_browser)
+
+    def test_item_controls(self):
+        page = static_page(self.catalog.item(7), url=BASE + "/shop/item/7")
+
+        self.assertEqual(page.snapshot["inputs"], ["quantity"])
+        self.assertEqual(page.snapshot["buttons"], ["add to cart"])
+        self.assertEqual(page.link_target("back to category"), BASE + "/shop/category/2")
+        self.assertTrue(page.has_control("click_button", "add to cart"))
+        self.assertTrue(page.has_control("type", "quantity"))
+        self.assertFalse(page.has_control("click_link", "checkout"))
+        self.assertIn("BUTTON", page.snapshot["skeleton"])
+        self.assertIsNone(page.requires_browser)
+
+    def test_checkout_form(self):
+        page = static_page(self.catalog.checkout(), url=BASE + "/shop/checkout")
+
+        self.assertEqual(page.snapshot["inputs"], ["name", "address"])
+        self.assertEqual(page.snapshot["buttons"], ["place order"])
+
+
+class RequiresBrowserTest(unittest.TestCase):
+    def test_script_rendered_page(self):
+        page = static_page('<html><body><div id="root"></div><script src="/app.js"></script></body></html>')
+        self.assertIn("client-rendered", page.requires_browser)
+
+    def test_meta_refresh(self):
+        html = '<html><head><meta http-equiv="Refresh" content="0; url=/next"></head><body><p>{}</p></body></html>'
+        page = static_page(html.format("moving " * 100))
+        self.assertEqual(page.requires_browser, "meta refresh")
+
+    def test_non_2xx_status(self):
+        self.assertEqual(static_page("<p>not here</p>", status=404).requires_browser, "HTTP 404")
+        self.assertEqual(static_page("", status=302).requires_browser, "HTTP 302")
+
+    def test_non_html_content(self):
+        page = static_page('{"ok": true}', content_type="application/json")
+        self.assertEqual(page.requires_browser, "not an HTML page (application/json)")
+
+
+class CookieHeaderTest(unittest.TestCase):
+    COOKIES = [
+        {"name": "site", "value": "1", "domain": ".example.com", "path": "/"},
+        {"name": "host", "value": "2", "domain": "shop.example.com", "path": "/"},
+        {"name": "account", "value": "3", "domain": "shop.example.com", "path": "/account"},
+        {"name": "session", "value": "4", "domain": "shop.example.com", "path": "/", "secure": True},
+    ]
+
+    def test_domain_matching(self):
+        self.assertEqual(cookie_header(self.COOKIES, "http://example.com/"), "site=1")
+        self.assertEqual(cookie_header(self.COOKIES, "http://shop.example.com/"), "site=1; host=2")
+        self.assertEqual(cookie_header(self.COOKIES, "http://a.shop.example.com/"), "site=1; host=2")
+        self.assertIsNone(cookie_header(self.COOKIES, "http://notexample.com/"))
+
+    def test_path_matching(self):
+        self.assertEqual(cookie_header(self.COOKIES, "http://shop.example.com/account/orders"),
+                         "site=1; host=2; account=3")
+        self.assertEqual(cookie_header(self.COOKIES, "http://shop.example.com/cart"), "site=1; host=2")
+
+    def test_secure_only_over_https(self):
+        self.assertEqual(cookie_header(self.COOKIES, "https://shop.example.com/"), "site=1; host=2; session=4")
+
+
+class HttpFetcherTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = FixtureServer(create_fixture_app(num_items=50, num_categories=5, page_size=5))
+        cls.server.__enter__()
+        cls.fetcher = HttpFetcher(timeout=5)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.__exit__(None, None, None)
+
+    def test_fetches_and_parses_fixture_page(self):
+        page = self.fetcher.fetch(self.server.base_url + "/shop/item/3")
+
+        self.assertEqual(page.status, 200)
+        self.assertEqual(page.snapshot["inputs"], ["quantity"])
+        self.assertEqual(page.link_target("item 4"), self.server.base_url + "/shop/item/4")
+        self.assertIsNone(page.requires_browser)
+
+    def test_follows_redirects_to_final_url(self):
+        page = self.fetcher.fetch(self.server.base_url + "/shop")
+
+        self.assertEqual(page.status, 200)
+        self.assertEqual(page.url, self.server.base_url + "/shop/")
+        self.assertIsNone(page.requires_browser)
+
+    def test_missing_page_goes_to_browser(self):
+        page = self.fetcher.fetch(self.server.base_url + "/shop/item/999")
+        self.assertEqual(page.requires_browser, "HTTP 404")
+
+
+if __name__ == "__main__":
+    unittest.main()
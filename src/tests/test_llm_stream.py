@@ -0,0 +1,141 @@
+import json
+import threading
+import unittest
+
+from agent.llm_cache import LLMResponseCache
+from agent.llm_planner import BedrockLLM, StreamingPlan
+from agent.rate_limiter import RateLimiter
+
+
+def chunk(text):
+    return {"chunk": {"bytes": json.dumps({"completion": text}).encode("utf-8")}}
+
+
+class FakeStreamBody:
+    """Event stream like the body of invoke_model_with_response_stream; waits for gate before event pause_at."""
+
+    def __init__(self, events, gate=None, pause_at=None):
+        self.events = events
+        self.gate = gate
+        self.pause_at = pause_at
+        self.read = 0
+        self.closed = False
+
+    def __iter__(self):
+        for i, event in enumerate(self.events):
+            if i == self.pause_at:
+                self.gate.wait(5)
+            if self.closed:
+                return
+            self.read += 1
+            yield event
+
+    def close(self):
+        self.closed = True
+
+
+class FakeBedrockClient:
+    def __init__(self, body):
+        self.body = body
+        self.calls = 0
+
+    def invoke_model_with_response_stream(self, **kwargs):
+        self.calls += 1
+        return {"body": self.body}
+
+
+COMPLETION = [
+    chunk("Sure:\nclick_button:Sa"),
+    chunk("ve\ntype:email:a@b.c\n"),
+    chunk("click_link:Home\nclick_link:Ab"),
+    chunk("out"),
+]
+
+
+class QueryStreamTest(unittest.TestCase):
+    def make_llm(self, body):
+        client = FakeBedrockClient(body)
+        llm = BedrockLLM(client=client, cache=LLMResponseCache(path=None), rate_limiter=RateLimiter())
+        return llm, client
+
+    def cached(self, llm):
+        return llm.cache.get(llm.cache.make_key(llm.model_id, llm._request_body("plan", "", "", "")))
+
+    def test_parses_actions_across_chunks_and_caches_completed_stream(self):
+        body = FakeStreamBody(COMPLETION)
+        llm, client = self.make_llm(body)
+
+        actions = list(llm.query_stream("plan"))
+
+        expected = ["click_button:save", "type:email:a@b.c", "click_link:home", "click_link:about"]
+        self.assertEqual(actions, expected)
+        self.assertEqual(self.cached(llm), "Sure:\nclick_button:Save\ntype:email:a@b.c\nclick_link:Home\nclick_link:About")
+        self.assertEqual(list(llm.query_stream("plan")), expected)
+        self.assertEqual(client.calls, 1)
+
+    def test_max_actions_closes_stream_without_caching(self):
+        body = FakeStreamBody(COMPLETION)
+        llm, _ = self.make_llm(body)
+
+        self.assertEqual(list(llm.query_stream("plan", max_actions=2)), ["click_button:save", "type:email:a@b.c"])
+        self.assertTrue(body.closed)
+        self.assertEqual(body.read, 2)
+        self.assertIsNone(self.cached(llm))
+
+    def test_caller_closing_generator_closes_stream(self):
+        body = FakeStreamBody(COMPLETION)
+        llm, _ = self.make_llm(body)
+
+        stream = llm.query_stream("plan")
+        self.assertEqual(next(stream), "click_button:save")
+        stream.close()
+
+        self.assertTrue(body.closed)
+        self.assertIsNone(self.cached(llm))
+
+    def test_error_event_raises_and_closes_stream(self):
+        body = FakeStreamBody([chunk("click_button:Save\n"), {"throttlingException": {"message": "slow down"}}])
+        llm, _ = self.make_llm(body)
+
+        with self.assertRaises(RuntimeError):
+            list(llm.query_stream("plan"))
+        self.assertTrue(body.closed)
+        self.assertIsNone(self.cached(llm))
+
+    def test_cancelled_plan_stops_reading(self):
+        gate = threading.Event()
+        body = FakeStreamBody(COMPLETION, gate=gate, pause_at=2)  # The first action completes in event 1
+        llm, _ = self.make_llm(body)
+        completed = []
+
+        plan = StreamingPlan(llm.query_stream("plan"), fallback=["click_link:fallback"],
+                             on_complete=lambda streamed, error: completed.append(streamed))
+        self.assertEqual(next(iter(plan)), "click_button:save")
+        plan.cancel()
+        gate.set()
+
+        self.assertNotIn("click_link:home", plan.result())
+        self.assertTrue(body.closed)
+        self.assertLess(body.read, len(COMPLETION))
+        self.assertEqual(completed, [])
+        self.assertIsNone(self.cached(llm))
+
+    def test_plan_indexing_waits_only_for_the_needed_action(self):
+        gate = threading.Event()
+        body = FakeStreamBody(COMPLETION, gate=gate, pause_at=2)
+        llm, _ = self.make_llm(body)
+
+        plan = StreamingPlan(llm.query_stream("plan"))
+        self.assertTrue(plan)
+        self.assertEqual(plan[0], "click_button:save")
+        self.assertFalse(plan.done)
+        gate.set()
+
+        self.assertEqual(plan[3], "click_link:about")
+        with self.assertRaises(IndexError):
+            plan[4]
+        self.assertEqual(len(plan), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()